@@ -0,0 +1,304 @@
+import hashlib
+import json
+import re
+import tempfile
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from TableSinks import TableSink
+
+# Столбцы, которые добавляются к результату при разрешении сущностей
+RESOLVED_COLUMNS = [
+    "Местонахождение (канон.)",
+    "Ответственное лицо (канон.)",
+    "ID ответственного лица",
+]
+
+# Латинские буквы, которые в номерах кабинетов пишут вместо похожих русских
+_LATIN_TO_CYRILLIC = str.maketrans("ABCEHKMOPTXY", "АВСЕНКМОРТХУ")
+_CABINET_REGEX = re.compile(r'^(?:(?:к\.|каб\.)\s*)*(\d+)\s*[-–]?\s*([A-Za-zА-Яа-яЁё]?)$', re.IGNORECASE)
+_NAME_TOKEN_REGEX = re.compile(r'[A-Za-zА-Яа-яЁё]+\.?')
+
+# Окончание фамилии: различия в нем обычно означают другого человека
+# ("Иванов" и "Иванова", "Кузьменко" и "Кузьменков"), а не опечатку
+ENDING_LENGTH = 2
+# Гласные, замена которых в окончании меняет род или форму фамилии ("Петрова" и "Петрово")
+_ENDING_VOWELS = set("аеиоуыэюяй")
+# Более короткие фамилии сравниваются только на точное совпадение
+MIN_TYPO_LENGTH = 4
+
+
+class PersonName(NamedTuple):
+    """
+    Разобранное имя ответственного лица.
+
+    Attributes:
+        surname (str): Фамилия с заглавной буквы.
+        initials (str): Инициалы без точек, например "ИИ", или пустая строка.
+    """
+    surname: str
+    initials: str
+
+    def __str__(self) -> str:
+        if not self.initials:
+            return self.surname
+        return self.surname + " " + "".join(initial + "." for initial in self.initials)
+
+
+def normalize_cabinet(value: str) -> str:
+    """
+    Приводит номер кабинета к каноническому виду: "301a", "301-А", "301 а" и "к.301А"
+    становятся "301А". Значения, не похожие на номер кабинета, только очищаются
+    от лишних пробелов.
+    """
+    value = " ".join(str(value).split())
+    match = _CABINET_REGEX.match(value)
+    if match is None:
+        return value
+    number, letter = match.groups()
+    return number + letter.upper().translate(_LATIN_TO_CYRILLIC).replace("Ё", "Е")
+
+
+def parse_person(value: str) -> Optional[PersonName]:
+    """
+    Разбирает имя ответственного лица: "Иванов И.И.", "Иванов И. И.", "И.И.Иванов"
+    и "Иванов Иван Иванович" дают фамилию "Иванов" и инициалы "ИИ".
+
+    Return:
+        Разобранное имя или None, если в значении нет фамилии.
+    """
+    tokens = _NAME_TOKEN_REGEX.findall(str(value))
+    words = [token for token in tokens if len(token.rstrip(".")) > 1]
+    if not words:
+        return None
+    if len(words) < len(tokens):
+        # Есть инициалы: фамилия — первое слово, инициалы — остальные токены по порядку
+        surname = words[0]
+        others = [token for token in tokens if token is not surname]
+    else:
+        # Полное имя: фамилия, имя, отчество
+        surname, others = words[0], words[1:]
+    surname = surname.rstrip(".")
+    initials = "".join(token[0].upper() for token in others)
+    return PersonName(surname[0].upper() + surname[1:].lower(), initials)
+
+
+def is_typo(first: str, second: str) -> bool:
+    """
+    Проверяет, похоже ли различие двух фамилий на опечатку: одна замена буквы,
+    перестановка соседних букв или пропуск одной буквы не в окончании. Фамилии,
+    отличающиеся окончанием ("Иванов" и "Иванова", "Кузьменко" и "Кузьменков",
+    "Петрова" и "Петрово"), опечаткой не считаются.
+    """
+    first, second = first.lower().replace("ё", "е"), second.lower().replace("ё", "е")
+    if len(first) > len(second):
+        first, second = second, first
+    if first == second or len(first) < MIN_TYPO_LENGTH:
+        return first == second
+    ending = len(second) - ENDING_LENGTH
+    if len(first) == len(second):
+        diff = [i for i in range(len(first)) if first[i] != second[i]]
+        if len(diff) == 1:
+            i = diff[0]
+            return i < ending or not (first[i] in _ENDING_VOWELS and second[i] in _ENDING_VOWELS)
+        return (len(diff) == 2 and diff[1] == diff[0] + 1 and diff[1] < ending
+                and first[diff[0]] == second[diff[1]] and first[diff[1]] == second[diff[0]])
+    if len(second) - len(first) == 1:
+        # Первая несовпадающая позиция — место пропущенной буквы
+        i = next((i for i in range(len(first)) if first[i] != second[i]), len(first))
+        return i < ending and first[i:] == second[i + 1:]
+    return False
+
+
+def person_id(name: str) -> str:
+    """
+    Идентификатор ответственного лица по его каноническому имени, не зависит от запуска.
+    """
+    return "P" + hashlib.blake2b(name.encode("utf-8"), digest_size=5).hexdigest()
+
+
+class EntityResolver:
+    """
+    Разрешение ответственных лиц: написания одного человека получают одно каноническое имя.
+
+    Имена сначала нормализуются (parse_person), затем сравниваются только внутри блоков
+    с одинаковым началом фамилии (blocking), поэтому время растет почти линейно с числом
+    различных имен. Внутри блока фамилии, которые отличаются опечаткой (is_typo),
+    с одинаковыми инициалами объединяются. Имя без инициалов или с частью инициалов
+    присоединяется к человеку, только если подходящий человек в блоке один, иначе
+    оно остается отдельным, чтобы не объединить разных людей с одной фамилией.
+    """
+
+    def __init__(self, typos: bool = True, prefix_length: int = 3, max_block_size: int = 1000) -> None:
+        """
+        Args:
+            typos (bool): Объединять фамилии, отличающиеся опечаткой; False — только точное совпадение.
+            prefix_length (int): Длина начала фамилии, по которому строятся блоки.
+            max_block_size (int): Если в блоке больше различных фамилий, фамилии в нем
+                сравниваются только на точное совпадение.
+        """
+        self.typos = typos
+        self.prefix_length = prefix_length
+        self.max_block_size = max_block_size
+        self._counts: Counter = Counter()
+
+    def add(self, names: Iterable[str]) -> None:
+        """
+        Учитывает имена ответственных лиц; 'Null' пропускается.
+        """
+        self._counts.update(name for name in names if name != 'Null')
+
+    def resolve(self) -> Dict[str, str]:
+        """
+        Return:
+            Словарь {исходное имя: каноническое имя} для всех учтенных имен.
+        """
+        parsed: Dict[str, Optional[PersonName]] = {name: parse_person(name) for name in self._counts}
+        person_counts: Counter = Counter()
+        for name, person in parsed.items():
+            if person is not None:
+                person_counts[person] += self._counts[name]
+
+        blocks: Dict[str, List[PersonName]] = defaultdict(list)
+        for person in person_counts:
+            blocks[self._block_key(person.surname)].append(person)
+
+        canonical: Dict[PersonName, PersonName] = {}
+        for persons in blocks.values():
+            canonical.update(self._resolve_block(persons, person_counts))
+
+        return {
+            name: str(canonical[person]) if person is not None else " ".join(name.split())
+            for name, person in parsed.items()
+        }
+
+    def _block_key(self, surname: str) -> str:
+        return surname.lower().replace("ё", "е")[:self.prefix_length]
+
+    def _resolve_block(self, persons: List[PersonName], counts: Counter) -> Dict[PersonName, PersonName]:
+        # Объединение фамилий, отличающихся опечаткой
+        surnames = sorted({person.surname for person in persons})
+        parent = {surname: surname for surname in surnames}
+
+        def find(surname: str) -> str:
+            while parent[surname] != surname:
+                parent[surname] = parent[parent[surname]]
+                surname = parent[surname]
+            return surname
+
+        if len(surnames) <= self.max_block_size and self.typos:
+            for i in range(len(surnames)):
+                for j in range(i + 1, len(surnames)):
+                    if abs(len(surnames[i]) - len(surnames[j])) <= 1 and is_typo(surnames[i], surnames[j]):
+                        parent[find(surnames[j])] = find(surnames[i])
+
+        # Люди: группа похожих фамилий и инициалы
+        groups: Dict[Tuple[str, str], List[PersonName]] = defaultdict(list)
+        for person in persons:
+            groups[(find(person.surname), person.initials)].append(person)
+        initials_by_surname: Dict[str, List[str]] = defaultdict(list)
+        for group_surname, initials in groups:
+            initials_by_surname[group_surname].append(initials)
+
+        # Неполные инициалы присоединяются к единственному человеку, инициалы которого
+        # их продолжают ("Иванов" и "Иванов И." к "Иванов И.И.")
+        clusters: Dict[Tuple[str, str], List[PersonName]] = defaultdict(list)
+        for (group_surname, initials), members in groups.items():
+            longer = [other for other in initials_by_surname[group_surname]
+                      if other != initials and other.startswith(initials)]
+            longest = [other for other in longer
+                       if not any(value != other and value.startswith(other) for value in longer)]
+            target = longest[0] if len(longest) == 1 else initials
+            clusters[(group_surname, target)].extend(members)
+
+        canonical = {}
+        for (_, initials), members in clusters.items():
+            # Каноническая фамилия — самое частое написание среди полных имен
+            full = [member for member in members if member.initials == initials]
+            surname = max(sorted({member.surname for member in full}),
+                          key=lambda value: sum(counts[member] for member in full if member.surname == value))
+            for member in members:
+                canonical[member] = PersonName(surname, initials)
+        return canonical
+
+
+class EntityResolvingSink(TableSink):
+    """
+    Приемник, который добавляет к строкам канонические места хранения и ответственных лиц
+    (RESOLVED_COLUMNS) и передает их приемнику sink.
+
+    Для разрешения нужны все имена таблицы, поэтому строки до close сохраняются
+    во временный файл, в памяти хранятся только различные имена. В prepare имена
+    разрешаются и строки за один проход записываются в sink.
+    """
+
+    def __init__(self, sink: TableSink, resolver: Optional[EntityResolver] = None) -> None:
+        """
+        Args:
+            sink (TableSink): Приемник результата.
+            resolver (Optional[EntityResolver]): Разрешение ответственных лиц, по умолчанию EntityResolver().
+        """
+        self.sink = sink
+        self.resolver = resolver if resolver is not None else EntityResolver()
+        self._rows_file = None
+
+    def open(self, columns: List[str]) -> None:
+        self._location_position = columns.index("Местонахождение")
+        self._person_position = columns.index("Ответственное лицо")
+        self._rows_file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.sink.open(list(columns) + RESOLVED_COLUMNS)
+
+    def write_rows(self, rows: Iterable[Sequence]) -> None:
+        lines = []
+        persons = []
+        for row in rows:
+            values = [str(value) for value in row]
+            persons.append(values[self._person_position])
+            lines.append(json.dumps(values, ensure_ascii=False) + "\n")
+        self.resolver.add(persons)
+        self._rows_file.write("".join(lines))
+
+    def prepare(self, batch_rows: int = 10000) -> None:
+        # Строки с разрешенными сущностями передаются приемнику sink, который
+        # подготавливает, но еще не публикует результат
+        if self._rows_file is None:
+            return
+        try:
+            canonical_persons = self.resolver.resolve()
+            canonical_locations: Dict[str, str] = {}
+            self._rows_file.seek(0)
+            batch = []
+            for line in self._rows_file:
+                values = json.loads(line)
+                location = values[self._location_position]
+                canonical_location = canonical_locations.get(location)
+                if canonical_location is None:
+                    canonical_location = canonical_locations[location] = (
+                        'Null' if location == 'Null' else normalize_cabinet(location)
+                    )
+                person = canonical_persons.get(values[self._person_position], 'Null')
+                values += [canonical_location, person, 'Null' if person == 'Null' else person_id(person)]
+                batch.append(values)
+                if len(batch) >= batch_rows:
+                    self.sink.write_rows(batch)
+                    batch = []
+            if batch:
+                self.sink.write_rows(batch)
+        finally:
+            self._rows_file.close()
+            self._rows_file = None
+        self.sink.prepare()
+
+    def close(self) -> None:
+        try:
+            self.prepare()
+        except BaseException:
+            self.abort()
+            raise
+        self.sink.close()
+
+    def abort(self) -> None:
+        if self._rows_file is not None:
+            self._rows_file.close()
+            self._rows_file = None
+        self.sink.abort()
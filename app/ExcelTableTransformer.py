@@ -1,7 +1,21 @@
 import asyncio
-import pandas as pd
-from openpyxl import Workbook
-from NamedEntityRecognitionModels.RegexNamedEntityRecognizer import RegexNamedEntityRecognizer as NER
+import datetime
+import hashlib
+import math
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional, Union
+from NamedEntityRecognitionModels.NamedEntityRecognizer import NamedEntityRecognizer, recognizer_identity
+from NamedEntityRecognitionModels.RecognizerRegistry import available_recognizers, create_recognizer
+from Instrumentation import Instrumentation, InstrumentedNamedEntityRecognizer, NULL_INSTRUMENTATION
+from TableSinks import TableSink, TeeSink, sink_for_path
+from TransformationState import IncrementalReport, TransformationState
+
+# pandas и openpyxl импортируются в методах, которые их используют, чтобы
+# импорт модуля и запуск с --help не тратили время на их загрузку
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Определение структуры старой таблицы
 OLD_TABLE_STRUCTURE = [
@@ -43,40 +57,542 @@ NEW_TABLE_STRUCTURE = [
     "Заметка"
 ]
 
+# Строковые значения, которые pd.read_excel по умолчанию считает пропусками
+NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null"
+}
+
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+# Суффикс файла с состоянием инкрементального преобразования
+STATE_SUFFIX = ".state.sqlite"
+
+# Распознаватель по умолчанию, см. RecognizerRegistry
+DEFAULT_RECOGNIZER = "regex"
+
 class ExcelTableTransformer:
     """
     Переводит данные из старой Excel таблицы в новый формат, который является промежутком между Excel и реляционной БД
     """
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, ner: Union[NamedEntityRecognizer, str, None] = None, batch_size: int = 64,
+                 instrumentation: Optional[Instrumentation] = None) -> None:
         """
         Инициализация парсера старых файлов инвентаризации с путем к файлу.
 
         Args:
             path (str): Путь к файлу инвентаризации старого образца,
                 наименование столбцов должно совпадать с OLD_TABLE_STRUCTURE.
+            ner (Union[NamedEntityRecognizer, str, None]): Распознаватель сущностей или его имя
+                в RecognizerRegistry ("regex", "spacy", "llm", "cached:spacy", ...),
+                по умолчанию DEFAULT_RECOGNIZER.
+            batch_size (int): Сколько текстов передается распознавателю за один вызов.
+            instrumentation (Optional[Instrumentation]): Сбор метрик преобразования
+                (время этапов, вызовы распознавателя, статистика уровней каскада и кэша,
+                количество 'Null', медленные пакеты).
+                Отчет формируется в конце transform. По умолчанию метрики не собираются.
         """
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть положительным")
         self.path = path
-        self.NER = NER
+        if ner is None or isinstance(ner, str):
+            ner = create_recognizer(ner or DEFAULT_RECOGNIZER)
+        self.NER = ner
+        self.batch_size = batch_size
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+        # Распознаются ли пакеты одновременно (concurrency > 1): тогда для этапа "ner"
+        # процессорное время не замеряется
+        self._overlapping_batches = False
+        # Через recognizer идут все вызовы распознавателя, при сборе метрик это обертка над NER
+        self.recognizer = self.NER
+        if self.instrumentation.enabled:
+            self.recognizer = InstrumentedNamedEntityRecognizer(self.NER, self.instrumentation)
+            # Вызовы учитываются только у внешнего распознавателя, статистика уровней
+            # каскада и кэша берется из самих распознавателей
+            self.instrumentation.watch_recognizer(self.NER)
     
-    async def transform(self, new_path: str) -> None:
+    async def transform(self, new_path: str, streaming: bool = False,
+                        vectorized: bool = False, chunk_size: int = 10000,
+                        concurrency: int = 1, workers: int = 0,
+                        incremental: bool = False,
+                        sink: Optional[TableSink] = None,
+                        index_path: Optional[str] = None,
+                        resolve_entities: bool = False,
+                        state_path: Optional[str] = None) -> Optional[IncrementalReport]:
         """
         Создает и заполняет новый файл, данные берутся из файла
         старого образца.
         Args:
             new_path (str): Путь к файлу с результатом трансформации,
-                наименование столбцов будет 
-        """
-        wb = Workbook()
-        sheet = wb.active
-        sheet.append(NEW_TABLE_STRUCTURE)
-        df = pd.read_excel(self.path)
-        for _, note in df.iterrows():
-            new_note_dict = await self.__transform_in_new_format(note)
-            new_note = [new_note_dict[col] for col in NEW_TABLE_STRUCTURE]
-            sheet.append(new_note)
-        wb.save(new_path)
+                наименование столбцов будет NEW_TABLE_STRUCTURE. Формат выбирается
+                по расширению (.xlsx, .csv, .tsv, .parquet, .sqlite, .db), см. sink_for_path.
+            streaming (bool): Потоковый режим. Строки читаются лениво из
+                read-only книги и сразу пишутся в write-only книгу, поэтому
+                потребление памяти не зависит от числа строк.
+            vectorized (bool): Преобразовывать таблицу целыми столбцами вместо
+                построчной обработки. В потоковом режиме таблица обрабатывается
+                частями по chunk_size строк.
+            chunk_size (int): Размер части таблицы для vectorized в потоковом режиме
+                и для обработки в отдельных процессах (workers).
+            concurrency (int): Сколько пакетов по batch_size строк распознается одновременно.
+                Имеет смысл для распознавателей, которые ждут ввода-вывода (например, LLM),
+                порядок строк в результате сохраняется.
+            workers (int): Количество процессов для построчного преобразования. Таблица
+                делится на части по chunk_size строк, которые обрабатываются в пуле процессов,
+                каждый процесс держит свою копию распознавателя. 0 — преобразование в текущем процессе.
+            incremental (bool): Инкрементальный режим. В файле state_path хранятся
+                отпечатки строк, распознаются только новые и измененные строки,
+                остальные копируются из прошлого результата. После каждой части
+                из chunk_size строк фиксируется контрольная точка, прерванный запуск
+                продолжается с нее. Измененные строки части распознаются в workers процессах.
+            sink (Optional[TableSink]): Приемник результата вместо выбранного по new_path,
+                например PostgresSink или SqliteSink с другими параметрами.
+            index_path (Optional[str]): Путь к файлу индекса (InventoryIndex) для быстрого
+                поиска по инвентарному номеру, месту хранения и ответственному лицу,
+                который записывается вместе с результатом.
+            resolve_entities (bool): Добавить к результату канонические номера кабинетов
+                и ответственных лиц с их идентификаторами (RESOLVED_COLUMNS), см. EntityResolver.
+                Разные написания одного человека ("Иванов И.И.", "И.И.Иванов") получают
+                одно имя и один идентификатор. Строки записываются после обработки всей таблицы.
+            state_path (Optional[str]): Файл состояния инкрементального режима, по умолчанию
+                new_path + STATE_SUFFIX. Нужен, если new_path — не путь к файлу
+                (например, адрес PostgreSQL) или результат пишется в заданный sink.
+
+        При ошибке приемник отменяется (TableSink.abort), прежний результат не изменяется.
+        Если задан instrumentation, в конце вызывается его finish(). При workers > 0
+        распознавание идет в других процессах, поэтому для него учитывается только
+        время этапа "workers" по часам; при concurrency > 1 этап "ner" тоже замеряется
+        только по часам.
+        Return:
+            В инкрементальном режиме — итоги преобразования (IncrementalReport), иначе None.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency должен быть положительным")
+        if workers < 0:
+            raise ValueError("workers не может быть отрицательным")
+        if incremental and vectorized:
+            raise ValueError("инкрементальный режим не поддерживает vectorized")
+        if incremental and state_path is None:
+            state_path = new_path + STATE_SUFFIX
+        if sink is None:
+            sink = sink_for_path(new_path, streaming)
+        if index_path is not None:
+            from InventoryIndex import InventoryIndexSink
+            sink = TeeSink([sink, InventoryIndexSink(index_path)])
+        if resolve_entities:
+            from EntityResolver import EntityResolvingSink
+            sink = EntityResolvingSink(sink)
+        with self.instrumentation.stage("write"):
+            sink.open(NEW_TABLE_STRUCTURE)
+        try:
+            try:
+                result = await self.__transform_into(sink, streaming, vectorized, chunk_size,
+                                                     concurrency, workers, incremental, state_path)
+            except BaseException:
+                # Частичный результат не публикуется, прежний остается без изменений
+                sink.abort()
+                raise
+            with self.instrumentation.stage("write"):
+                sink.close()
+            return result
+        finally:
+            self.instrumentation.finish()
+
+    async def __transform_into(self, sink: TableSink, streaming: bool, vectorized: bool,
+                               chunk_size: int, concurrency: int, workers: int,
+                               incremental: bool, state_path: Optional[str]) -> Optional[IncrementalReport]:
+        """
+        Записывает в открытый приемник строки нового формата, параметры как у transform.
+        """
+        import pandas as pd
+        instrumentation = self.instrumentation
+        self._overlapping_batches = concurrency > 1
+        if vectorized:
+            if streaming:
+                frames = instrumentation.timed_iter("read", self.__iter_old_frames(chunk_size))
+            else:
+                with instrumentation.stage("read"):
+                    frames = [pd.read_excel(self.path)]
+            for frame in frames:
+                new_frame = await self.__transform_frame_in_new_format(frame)
+                if instrumentation.enabled:
+                    instrumentation.count_rows(len(new_frame))
+                    instrumentation.count_nulls("location", int((new_frame["Местонахождение"] == 'Null').sum()))
+                    instrumentation.count_nulls("responsible_person",
+                                                int((new_frame["Ответственное лицо"] == 'Null').sum()))
+                with instrumentation.stage("write"):
+                    sink.write_rows(new_frame.itertuples(index=False, name=None))
+            return None
+
+        if streaming:
+            notes = self.__iter_old_notes()
+        else:
+            with instrumentation.stage("read"):
+                df = pd.read_excel(self.path)
+            notes = (note for _, note in df.iterrows())
+        notes = instrumentation.timed_iter("read", notes)
+
+        if incremental:
+            state = TransformationState(state_path)
+            try:
+                return await self.__transform_incrementally(
+                    notes, sink, state, chunk_size, concurrency, workers
+                )
+            finally:
+                state.close()
+
+        if workers:
+            loop = asyncio.get_running_loop()
+            chunks = self.__iter_batches((dict(note) for note in notes), chunk_size)
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(self.NER, self.batch_size)) as pool:
+                async def transform_in_pool(chunk):
+                    with instrumentation.stage("workers", cpu=False):
+                        return await loop.run_in_executor(pool, _transform_chunk, chunk)
+
+                async for new_chunk in self.__transform_concurrently(chunks, workers, transform_in_pool):
+                    self.__write_rows(sink, new_chunk)
+            return None
+
+        batches = self.__iter_batches(notes, self.batch_size)
+        async for new_batch in self.__transform_concurrently(batches, concurrency, self._transform_chunk):
+            self.__write_rows(sink, new_batch)
+        return None
+
+    def __write_rows(self, sink: TableSink, rows: list) -> None:
+        """
+        Записывает строки нового формата в приемник, учитывая их в метриках.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation.enabled:
+            instrumentation.count_rows(len(rows))
+            location = NEW_TABLE_STRUCTURE.index("Местонахождение")
+            person = NEW_TABLE_STRUCTURE.index("Ответственное лицо")
+            instrumentation.count_nulls("location", sum(1 for row in rows if row[location] == 'Null'))
+            instrumentation.count_nulls("responsible_person", sum(1 for row in rows if row[person] == 'Null'))
+        with instrumentation.stage("write"):
+            sink.write_rows(rows)
+
+    async def __transform_incrementally(self, notes, sink: TableSink, state: TransformationState,
+                                        chunk_size: int, concurrency: int, workers: int) -> IncrementalReport:
+        """
+        Инкрементальное преобразование: распознаются только строки, отпечатки которых
+        отличаются от сохраненных в state, остальные берутся из state.
+
+        Ключ строки — "Инвентарный номер" (для повторяющихся номеров к нему добавляется
+        порядковый номер повтора), отпечаток — хеш значений строки и версии распознавателя.
+        Args:
+            notes: строки старого формата.
+            sink (TableSink): приемник, в который записывается результат.
+            state (TransformationState): состояние прошлых запусков.
+            chunk_size (int): размер части таблицы между контрольными точками.
+            concurrency (int): сколько пакетов распознается одновременно.
+            workers (int): количество процессов для распознавания, 0 — в текущем процессе.
+                Измененные строки части делятся между процессами поровну, но не меньше
+                чем по batch_size строк.
+        Return:
+            Итоги преобразования.
+        """
+        state.begin_run()
+        # Полное описание распознавателя: для оберток (cached) — и оборачиваемого распознавателя с моделью
+        backend = recognizer_identity(self.NER)
+        occurrences = {}
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                   initargs=(self.NER, self.batch_size)) if workers else None
+        loop = asyncio.get_running_loop()
+
+        async def transform_in_pool(notes):
+            with self.instrumentation.stage("workers", cpu=False):
+                return await loop.run_in_executor(pool, _transform_chunk, notes)
+
+        try:
+            for chunk in self.__iter_batches(notes, chunk_size):
+                keys, fingerprints = [], []
+                for note in chunk:
+                    inventory_number = str(note["Инвентарный номер"])
+                    occurrence = occurrences.get(inventory_number, 0)
+                    occurrences[inventory_number] = occurrence + 1
+                    keys.append(inventory_number if occurrence == 0 else f"{inventory_number}#{occurrence}")
+                    fingerprints.append(self.__fingerprint(note, backend))
+
+                stored = state.load(keys)
+                new_notes = [None] * len(chunk)
+                statuses = [None] * len(chunk)
+                changed = []
+                for i, (key, fingerprint) in enumerate(zip(keys, fingerprints)):
+                    saved = stored.get(key)
+                    if saved is not None and saved[0] == fingerprint:
+                        new_notes[i] = saved[1]
+                        # Строки, сохраненные прерванным запуском, сохраняют свой статус
+                        statuses[i] = saved[3] if saved[2] == state.run_id else "unchanged"
+                    else:
+                        statuses[i] = "added" if saved is None else "changed"
+                        changed.append(i)
+
+                if changed:
+                    changed_notes = [chunk[i] for i in changed]
+                    transformed = []
+                    if pool is not None:
+                        size = max(self.batch_size, math.ceil(len(changed_notes) / workers))
+                        parts = self.__iter_batches([dict(note) for note in changed_notes], size)
+                        results = self.__transform_concurrently(parts, workers, transform_in_pool)
+                    else:
+                        batches = self.__iter_batches(changed_notes, self.batch_size)
+                        results = self.__transform_concurrently(batches, concurrency, self._transform_chunk)
+                    async for new_batch in results:
+                        transformed.extend(new_batch)
+                    for i, new_note in zip(changed, transformed):
+                        new_notes[i] = new_note
+
+                self.__write_rows(sink, new_notes)
+                state.commit(zip(keys, fingerprints, new_notes, statuses))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return state.finish_run()
+
+    @staticmethod
+    def __fingerprint(note: dict, backend: str) -> str:
+        """
+        Хеш содержимого строки старого формата и распознавателя, который ее обработает.
+        """
+        content = "\x1f".join([backend] + [f"{col}={note[col]}" for col in note.keys()])
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+    async def _transform_chunk(self, notes: list) -> list:
+        """
+        Преобразует часть таблицы, передавая строки распознавателю пакетами по batch_size.
+        Args:
+            notes (list): строки, ключи которых удовлетворяют OLD_TABLE_STRUCTURE.
+        Return:
+            Строки нового формата в виде списков значений в порядке NEW_TABLE_STRUCTURE.
+        """
+        new_notes = []
+        for batch in self.__iter_batches(notes, self.batch_size):
+            for new_note_dict in await self.__transform_batch_in_new_format(batch):
+                new_notes.append([new_note_dict[col] for col in NEW_TABLE_STRUCTURE])
+        return new_notes
+
+    async def __transform_concurrently(self, batches, concurrency: int, transform_batch):
+        """
+        Конвейер преобразования: чтение пакетов, их обработка transform_batch в concurrency
+        параллельных задачах и выдача результатов в исходном порядке.
+
+        Одновременно в работе находится не больше 2 * concurrency пакетов: чтение
+        приостанавливается, пока самый старый из них не будет выдан, поэтому
+        потребление памяти ограничено даже при медленном распознавателе.
+        Args:
+            batches: итерируемый объект со списками строк старого формата.
+            concurrency (int): количество параллельных задач распознавания.
+            transform_batch: асинхронная функция, преобразующая пакет.
+        Yields:
+            Результаты transform_batch в исходном порядке пакетов.
+        """
+        slots = asyncio.Semaphore(2 * concurrency)
+        jobs = asyncio.Queue()
+        results = asyncio.Queue()
+
+        async def read():
+            count = 0
+            try:
+                for batch in batches:
+                    await slots.acquire()
+                    await jobs.put((count, batch))
+                    count += 1
+            except Exception as error:
+                await results.put(("error", error))
+            else:
+                await results.put(("end", count))
+            finally:
+                for _ in range(concurrency):
+                    jobs.put_nowait(None)
+
+        async def extract():
+            while (job := await jobs.get()) is not None:
+                index, batch = job
+                try:
+                    await results.put((index, await transform_batch(batch)))
+                except Exception as error:
+                    await results.put(("error", error))
+
+        tasks = [asyncio.create_task(read())]
+        tasks += [asyncio.create_task(extract()) for _ in range(concurrency)]
+        try:
+            pending = {}
+            next_index = 0
+            total = None
+            while total is None or next_index < total:
+                key, value = await results.get()
+                if key == "error":
+                    raise value
+                if key == "end":
+                    total = value
+                    continue
+                pending[key] = value
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+                    slots.release()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def __iter_batches(items, size: int):
+        """
+        Разбивает итерируемый объект на списки длиной не больше size.
+        """
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def __iter_old_frames(self, chunk_size: int):
+        """
+        Лениво читает файл старого образца частями по chunk_size строк.
+
+        Yields:
+            pd.DataFrame: часть таблицы, столбцы удовлетворяют OLD_TABLE_STRUCTURE.
+        """
+        import pandas as pd
+        chunk = []
+        for note in self.__iter_old_notes():
+            chunk.append(note)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk)
+
+    def __iter_old_notes(self):
+        """
+        Лениво читает строки файла старого образца, не загружая его в память целиком.
+
+        Файл читается в два прохода: первый определяет тип каждого столбца так же,
+        как это делает pd.read_excel (числовой, дата или строковый), второй
+        приводит значения к этому типу и отдает строки по одной. Благодаря этому
+        результат совпадает с результатом обычного режима.
+
+        Yields:
+            dict: словарь ключи которого удовлетворяют OLD_TABLE_STRUCTURE.
+        """
+        from openpyxl import load_workbook
+        wb = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            sheet = wb.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                str(name) if name is not None else f"Unnamed: {i}"
+                for i, name in enumerate(header)
+            ]
+            kinds = self.__infer_column_kinds(sheet, len(columns))
+
+            # pd.read_excel отбрасывает пустые строки в конце листа,
+            # но сохраняет их в середине
+            blank_rows = 0
+            for row in sheet.iter_rows(min_row=2, values_only=True):
+                if all(value is None for value in row):
+                    blank_rows += 1
+                    continue
+                for _ in range(blank_rows):
+                    yield {col: self.__convert_value(None, kind) for col, kind in zip(columns, kinds)}
+                blank_rows = 0
+                row = tuple(row) + (None,) * (len(columns) - len(row))
+                yield {
+                    col: self.__convert_value(value, kind)
+                    for col, value, kind in zip(columns, row, kinds)
+                }
+        finally:
+            wb.close()
+
+    @staticmethod
+    def __infer_column_kinds(sheet, columns_count: int) -> list:
+        """
+        Определяет тип каждого столбца по правилам pd.read_excel.
+
+        Args:
+            sheet: read-only лист openpyxl.
+            columns_count (int): Количество столбцов в заголовке.
+        Return:
+            Список типов столбцов: 'int', 'float', 'datetime' или 'object'.
+        """
+        seen = [set() for _ in range(columns_count)]
+        for row in sheet.iter_rows(min_row=2, max_col=columns_count, values_only=True):
+            for i, value in enumerate(row):
+                column = seen[i]
+                if "object" in column:
+                    continue
+                if value is None or (isinstance(value, str) and value in NA_VALUES):
+                    column.add("na")
+                elif isinstance(value, bool):
+                    column.add("object")
+                elif isinstance(value, datetime.datetime):
+                    column.add("datetime")
+                elif isinstance(value, int):
+                    column.add("int" if INT64_MIN <= value <= INT64_MAX else "object")
+                elif isinstance(value, float):
+                    column.add("float")
+                elif isinstance(value, str):
+                    column.add(ExcelTableTransformer.__numeric_kind(value))
+                else:
+                    column.add("object")
+
+        kinds = []
+        for column in seen:
+            has_na = "na" in column
+            column.discard("na")
+            if column == {"int"} and not has_na:
+                kinds.append("int")
+            elif column <= {"int", "float"}:
+                kinds.append("float")
+            elif column == {"datetime"}:
+                kinds.append("datetime")
+            else:
+                kinds.append("object")
+        return kinds
+
+    @staticmethod
+    def __numeric_kind(value: str) -> str:
+        """
+        Возвращает 'int' или 'float', если строку можно привести к числу, иначе 'object'.
+        """
+        if "_" in value:
+            return "object"
+        try:
+            number = int(value)
+            return "int" if INT64_MIN <= number <= INT64_MAX else "object"
+        except ValueError:
+            pass
+        try:
+            float(value)
+            return "float"
+        except ValueError:
+            return "object"
+
+    @staticmethod
+    def __convert_value(value, kind: str):
+        """
+        Приводит значение ячейки к типу столбца так же, как это делает pd.read_excel.
+        """
+        is_na = value is None or (isinstance(value, str) and value in NA_VALUES)
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return math.nan if is_na else float(value)
+        if kind == "datetime":
+            import pandas as pd
+            return pd.NaT if is_na else pd.Timestamp(value)
+        return math.nan if is_na else value
 
-    
     async def __transform_in_new_format(self, note: dict) -> dict:
         """
         Из строки таблицы старого формата, возращает строку нового формата,
@@ -86,11 +602,35 @@ class ExcelTableTransformer:
         Return:
             Возращает строку нового формата, ключи исходного словаря удовлетворяют формату NEW_TABLE_STRUCTURE
         """
+        return (await self.__transform_batch_in_new_format([note]))[0]
+
+    async def __transform_batch_in_new_format(self, notes: list) -> list:
+        """
+        Пакетная версия __transform_in_new_format: распознаватель вызывается
+        один раз на весь список строк.
+        Args:
+            notes (list): строки, ключи которых удовлетворяют OLD_TABLE_STRUCTURE.
+        Return:
+            Строки нового формата в том же порядке.
+        """
+        start = time.perf_counter()
+        datas = [str(note["Местонахождение"]) for note in notes]
+        with self.instrumentation.stage("ner", cpu=not self._overlapping_batches):
+            records = await self.recognizer.extract_all_batch(datas, [str(note["Наименование"]) for note in notes])
+        with self.instrumentation.stage("build"):
+            new_notes = [
+                self.__build_new_note(note, data, record.location, record.responsible_person)
+                for note, data, record in zip(notes, datas, records)
+            ]
+        self.instrumentation.record_batch(time.perf_counter() - start, datas)
+        return new_notes
+
+    def __build_new_note(self, note: dict, data: str, location: str, responsibility_person: str) -> dict:
+        """
+        Собирает строку нового формата из строки старого формата и извлеченных сущностей.
+        """
         result = dict()
-        MOL, storage_place = str(note["МОЛ/Место хранения"]).split(" - ")
-        data = str(note["Местонахождение"])
-        location = await self.NER.get_location(data + ' ' + note["Наименование"])
-        responsibility_person = await self.NER.get_responsible_person(data)
+        MOL, storage_place = self.__split_mol_storage_place(str(note["МОЛ/Место хранения"]))
         result["Наименование"] = str(note["Наименование"])
         result["Инвентарный номер"] = str(note["Инвентарный номер"])
         result["МОЛ"] = MOL
@@ -110,10 +650,146 @@ class ExcelTableTransformer:
         result["Заметка"] = data
         return result    
 
+    @staticmethod
+    def __split_mol_storage_place(value: str) -> tuple:
+        """
+        Разделяет значение "МОЛ/Место хранения" вида "МОЛ - Место хранения".
+
+        Если разделителя нет, место хранения считается неизвестным ('Null').
+        Если разделителей несколько, МОЛ берется до первого из них.
+        """
+        MOL, separator, storage_place = value.partition(" - ")
+        return MOL, storage_place if separator else 'Null'
+
+    async def __transform_frame_in_new_format(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Преобразует таблицу старого формата в таблицу нового формата целыми столбцами.
+
+        Результат совпадает с построчным преобразованием __transform_in_new_format,
+        включая значения 'nan' и 'Null'. Если распознаватель предоставляет регулярные
+        выражения CABINET_PATTERN и PERSON_PATTERN, они применяются ко всему столбцу
+        сразу, иначе extract_all_batch распознавателя вызывается по одному разу
+        на каждую уникальную пару местонахождения и наименования.
+        Args:
+            df (pd.DataFrame): таблица, столбцы которой удовлетворяют OLD_TABLE_STRUCTURE.
+        Return:
+            Таблица, столбцы которой удовлетворяют NEW_TABLE_STRUCTURE.
+        """
+        # Одно приведение всей таблицы к строкам; пропуски записываются так же,
+        # как их выводит str(): 'NaT' для дат и 'nan' для остальных столбцов
+        import pandas as pd
+        source = df.astype(object).astype(str)
+        for col in df.columns:
+            na_text = 'NaT' if pd.api.types.is_datetime64_any_dtype(df[col]) else 'nan'
+            source[col] = source[col].where(df[col].notna(), na_text)
+
+        data = source["Местонахождение"]
+        # Для пустой таблицы partition возвращает таблицу без столбцов
+        parts = source["МОЛ/Место хранения"].str.partition(" - ").reindex(columns=[0, 1, 2])
+
+        cabinet_pattern = getattr(self.NER, "CABINET_PATTERN", None)
+        person_pattern = getattr(self.NER, "PERSON_PATTERN", None)
+        with self.instrumentation.stage("ner"):
+            if cabinet_pattern is not None and person_pattern is not None:
+                location_text = data + ' ' + source["Наименование"]
+                location = location_text.str.extract(cabinet_pattern, flags=re.IGNORECASE)[1]
+                location = location.str.strip().fillna('Null')
+                person = data.str.extract('(' + person_pattern + ')')[0]
+                person = person.str.strip().fillna('Null')
+            else:
+                location, person = await self.__extract_unique(data, source["Наименование"])
+
+        result = pd.DataFrame(index=df.index)
+        result["Наименование"] = source["Наименование"]
+        result["Инвентарный номер"] = source["Инвентарный номер"]
+        result["МОЛ"] = parts[0]
+        result["Место хранения"] = parts[2].where(parts[1] != '', 'Null')
+        result["Местонахождение"] = location
+        result["Ответственное лицо"] = person
+        for col in NEW_TABLE_STRUCTURE[6:-1]:
+            result[col] = source[col]
+        result["Заметка"] = data
+        return result
+
+    async def __extract_unique(self, data: "pd.Series", names: "pd.Series") -> tuple:
+        """
+        Распознает сущности за один проход: extract_all_batch вызывается по одному разу
+        на каждую уникальную пару (местонахождение, наименование), пары передаются
+        частями по batch_size.
+        Return:
+            Столбцы мест хранения и ответственных лиц.
+        """
+        import pandas as pd
+        pairs = list(zip(data, names))
+        records = {}
+        for batch in self.__iter_batches(list(dict.fromkeys(pairs)), self.batch_size):
+            batch_records = await self.recognizer.extract_all_batch([pair[0] for pair in batch],
+                                                                    [pair[1] for pair in batch])
+            records.update(zip(batch, batch_records))
+        location = pd.Series([records[pair].location for pair in pairs], index=data.index, dtype=object)
+        person = pd.Series([records[pair].responsible_person for pair in pairs], index=data.index, dtype=object)
+        return location, person
+
+
+# Преобразователь процесса-обработчика пула, создается один раз при запуске процесса
+_worker_transformer = None
+_worker_loop = None
+
+
+def _init_worker(ner: NamedEntityRecognizer, batch_size: int) -> None:
+    """
+    Инициализация процесса-обработчика: распознаватель создается один раз на процесс
+    и используется для всех частей таблицы, которые обрабатывает этот процесс.
+    """
+    global _worker_transformer, _worker_loop
+    _worker_transformer = ExcelTableTransformer(None, ner=ner, batch_size=batch_size)
+    _worker_loop = asyncio.new_event_loop()
+
+
+def _transform_chunk(notes: list) -> list:
+    """
+    Преобразует часть таблицы в процессе-обработчике.
+    """
+    return _worker_loop.run_until_complete(_worker_transformer._transform_chunk(notes))
+
 
 def main():
-    excel_table_transfer = ExcelTableTransformer("/home/georgii/Projects/InventarizationBot/src/sample.xlsx")
-    asyncio.run(excel_table_transfer.transform("/home/georgii/Projects/InventarizationBot/src/new.xlsx"))
+    # argparse импортируется здесь, чтобы не замедлять импорт модуля
+    import argparse
+    parser = argparse.ArgumentParser(description="Перевод таблицы инвентаризации старого образца в новый формат")
+    parser.add_argument("path", nargs="?", default="/home/georgii/Projects/InventarizationBot/src/sample.xlsx",
+                        help="файл старого образца")
+    parser.add_argument("new_path", nargs="?", default="/home/georgii/Projects/InventarizationBot/src/new.xlsx",
+                        help="файл результата (.xlsx, .csv, .tsv, .parquet, .sqlite, .db)")
+    parser.add_argument("--backend", default=DEFAULT_RECOGNIZER,
+                        help="распознаватель: " + ", ".join(available_recognizers())
+                             + "; обертка указывается через двоеточие, например cached:spacy")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--vectorized", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--state", help="файл состояния инкрементального режима, "
+                                        "по умолчанию рядом с файлом результата")
+    parser.add_argument("--report", help="файл JSON для отчета с метриками преобразования")
+    parser.add_argument("--index", help="файл индекса для поиска по инвентарному номеру, "
+                                        "месту хранения и ответственному лицу")
+    parser.add_argument("--resolve-entities", action="store_true",
+                        help="добавить канонические кабинеты, ответственных лиц и их идентификаторы")
+    args = parser.parse_args()
+
+    instrumentation = None
+    if args.report:
+        instrumentation = Instrumentation(report_path=args.report)
+    excel_table_transfer = ExcelTableTransformer(args.path, ner=args.backend, batch_size=args.batch_size,
+                                                 instrumentation=instrumentation)
+    asyncio.run(excel_table_transfer.transform(
+        args.new_path, streaming=args.streaming, vectorized=args.vectorized, chunk_size=args.chunk_size,
+        concurrency=args.concurrency, workers=args.workers, incremental=args.incremental,
+        index_path=args.index, resolve_entities=args.resolve_entities, state_path=args.state
+    ))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,274 @@
+import heapq
+import itertools
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from NamedEntityRecognitionModels.NamedEntityRecognizer import NamedEntityRecognizer, EntityRecord
+
+# Верхние границы корзин гистограммы задержек в миллисекундах
+HISTOGRAM_BOUNDS_MS = [0.01, 0.1, 1, 10, 100, 1000, 10000]
+
+
+class Instrumentation:
+    """
+    Сбор метрик преобразования: время этапов (по часам и по процессорному времени),
+    количество и гистограммы задержек вызовов распознавателей, количество 'Null'
+    по типам сущностей и самые медленные пакеты строк вместе с их текстами.
+
+    Для распознавателей, переданных в watch_recognizer, в отчет добавляется статистика
+    вложенных распознавателей: уровней каскада (cascade_info) и кэша (cache_info).
+
+    Этапы, которые выполняются одновременно в нескольких задачах, замеряются только
+    по часам: процессорное время процесса общее для всех задач и учитывалось бы
+    несколько раз.
+
+    Отчет выводится в JSON в конце transform (report_path) и/или передается
+    в функцию on_report.
+    """
+
+    enabled = True
+
+    def __init__(self, top_n: int = 10, report_path: Optional[str] = None,
+                 on_report: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Args:
+            top_n (int): Сколько самых медленных пакетов хранить.
+            report_path (Optional[str]): Файл, в который записывается отчет в конце transform.
+            on_report (Optional[Callable[[dict], None]]): Функция, которая получает отчет в конце transform.
+        """
+        self.top_n = top_n
+        self.report_path = report_path
+        self.on_report = on_report
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.calls: Dict[str, Dict[str, object]] = {}
+        self.nulls: Dict[str, int] = {}
+        self.rows = 0
+        self._recognizers: List[NamedEntityRecognizer] = []
+        self._slowest: List[tuple] = []
+        # Порядковый номер пакета: пакеты с одинаковым временем не сравниваются по текстам
+        self._batch_numbers = itertools.count()
+
+    @contextmanager
+    def stage(self, name: str, cpu: bool = True):
+        """
+        Замеряет время этапа. Повторные замеры одного этапа суммируются.
+
+        Args:
+            name (str): Имя этапа.
+            cpu (bool): Замерять процессорное время; False для этапов, которые
+                выполняются одновременно с другими задачами того же процесса.
+        """
+        wall, cpu_start = time.perf_counter(), time.process_time() if cpu else None
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - wall,
+                           None if cpu_start is None else time.process_time() - cpu_start)
+
+    def add_stage(self, name: str, wall: float, cpu: Optional[float] = None) -> None:
+        stage = self.stages.setdefault(name, {"calls": 0, "wall_seconds": 0.0})
+        stage["calls"] += 1
+        stage["wall_seconds"] += wall
+        if cpu is not None:
+            stage["cpu_seconds"] = stage.get("cpu_seconds", 0.0) + cpu
+
+    def timed_iter(self, name: str, items):
+        """
+        Итерирует items, засчитывая время получения каждого элемента в этап name.
+        """
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def record_call(self, backend: str, method: str, seconds: float, items: int) -> None:
+        """
+        Учитывает вызов распознавателя.
+        """
+        call = self.calls.setdefault(f"{backend}.{method}", {
+            "calls": 0, "items": 0, "seconds": 0.0,
+            "histogram_ms": {str(bound): 0 for bound in HISTOGRAM_BOUNDS_MS + ["inf"]},
+        })
+        call["calls"] += 1
+        call["items"] += items
+        call["seconds"] += seconds
+        milliseconds = seconds * 1000
+        bound = next((bound for bound in HISTOGRAM_BOUNDS_MS if milliseconds <= bound), "inf")
+        call["histogram_ms"][str(bound)] += 1
+
+    def watch_recognizer(self, recognizer: NamedEntityRecognizer) -> None:
+        """
+        Добавляет в отчет статистику каскадов и кэшей в распознавателе recognizer
+        и во всех вложенных в него распознавателях. Статистика читается при формировании
+        отчета и накапливается за все время жизни распознавателя; распознаватели
+        в других процессах (workers) в нее не попадают.
+        """
+        self._recognizers.append(recognizer)
+
+    def count_rows(self, count: int) -> None:
+        self.rows += count
+
+    def count_nulls(self, entity: str, count: int) -> None:
+        self.nulls[entity] = self.nulls.get(entity, 0) + count
+
+    def record_batch(self, seconds: float, texts: List[str]) -> None:
+        """
+        Учитывает время преобразования пакета строк для списка самых медленных пакетов.
+        Время отдельных строк пакета не известно; чтобы найти медленные строки,
+        нужен batch_size=1.
+        """
+        if not texts or self.top_n <= 0:
+            return
+        entry = (seconds, next(self._batch_numbers), list(texts))
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def report(self) -> dict:
+        """
+        Возвращает собранные метрики в виде словаря, пригодного для JSON.
+        """
+        calls = {}
+        for name, call in self.calls.items():
+            calls[name] = dict(call, mean_ms=call["seconds"] * 1000 / call["calls"])
+        recognizers = {}
+        for recognizer in self._recognizers:
+            _collect_recognizer_stats(recognizer, type(recognizer).__name__, recognizers)
+        return {
+            "rows": self.rows,
+            "stages": self.stages,
+            "calls": calls,
+            "recognizers": recognizers,
+            "nulls": self.nulls,
+            "slowest_batches": [
+                {"ms": seconds * 1000, "rows": len(texts), "texts": texts}
+                for seconds, _, texts in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def finish(self) -> Optional[dict]:
+        """
+        Формирует отчет, записывает его в report_path и передает в on_report.
+        """
+        report = self.report()
+        if self.report_path is not None:
+            with open(self.report_path, "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if self.on_report is not None:
+            self.on_report(report)
+        return report
+
+
+def _collect_recognizer_stats(recognizer: NamedEntityRecognizer, path: str, stats: Dict[str, dict]) -> None:
+    """
+    Записывает в stats статистику распознавателя и вложенных в него распознавателей.
+    Ключ — путь от внешнего распознавателя: имена классов через "/", для уровней
+    каскада перед именем класса указывается номер уровня.
+    """
+    if hasattr(recognizer, "cascade_info"):
+        info = recognizer.cascade_info()
+        stats[path] = {"tiers": [tier._asdict() for tier in info.tiers], "unresolved": info.unresolved}
+    if hasattr(recognizer, "cache_info"):
+        stats[path] = recognizer.cache_info()._asdict()
+    for i, tier in enumerate(getattr(recognizer, "tiers", [])):
+        _collect_recognizer_stats(tier, f"{path}/{i}:{type(tier).__name__}", stats)
+    backend = getattr(recognizer, "backend", None)
+    if isinstance(backend, NamedEntityRecognizer):
+        _collect_recognizer_stats(backend, f"{path}/{type(backend).__name__}", stats)
+
+
+class NullInstrumentation:
+    """
+    Отключенный сбор метрик: все методы ничего не делают.
+    """
+
+    enabled = False
+
+    def stage(self, name: str, cpu: bool = True):
+        return nullcontext()
+
+    def add_stage(self, name: str, wall: float, cpu: Optional[float] = None) -> None:
+        pass
+
+    def timed_iter(self, name: str, items):
+        return items
+
+    def record_call(self, backend: str, method: str, seconds: float, items: int) -> None:
+        pass
+
+    def watch_recognizer(self, recognizer: NamedEntityRecognizer) -> None:
+        pass
+
+    def count_rows(self, count: int) -> None:
+        pass
+
+    def count_nulls(self, entity: str, count: int) -> None:
+        pass
+
+    def record_batch(self, seconds: float, texts: List[str]) -> None:
+        pass
+
+    def report(self) -> dict:
+        return {}
+
+    def finish(self) -> Optional[dict]:
+        return None
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class InstrumentedNamedEntityRecognizer(NamedEntityRecognizer):
+    """
+    Обертка над распознавателем, которая учитывает количество и время его вызовов.
+    """
+
+    def __init__(self, backend: NamedEntityRecognizer, instrumentation: Instrumentation) -> None:
+        """
+        Args:
+            backend (NamedEntityRecognizer): Распознаватель, вызовы которого учитываются.
+            instrumentation (Instrumentation): Куда записываются метрики.
+        """
+        self.backend = backend
+        self.instrumentation = instrumentation
+        self.backend_name = type(backend).__name__
+        self.VERSION = backend.VERSION
+
+    async def _call(self, method: str, items: int, call):
+        start = time.perf_counter()
+        result = await call
+        self.instrumentation.record_call(self.backend_name, method, time.perf_counter() - start, items)
+        return result
+
+    async def get_location(self, data: str) -> str:
+        return await self._call("get_location", 1, self.backend.get_location(data))
+
+    async def get_responsible_person(self, data: str) -> str:
+        return await self._call("get_responsible_person", 1, self.backend.get_responsible_person(data))
+
+    async def get_locations(self, data: List[str]) -> List[str]:
+        return await self._call("get_locations", len(data), self.backend.get_locations(data))
+
+    async def get_responsible_persons(self, data: List[str]) -> List[str]:
+        return await self._call("get_responsible_persons", len(data), self.backend.get_responsible_persons(data))
+
+    async def extract_all(self, data: str, context: Optional[str] = None) -> EntityRecord:
+        return await self._call("extract_all", 1, self.backend.extract_all(data, context))
+
+    async def extract_all_batch(self, data: List[str],
+                                contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        return await self._call("extract_all_batch", len(data), self.backend.extract_all_batch(data, contexts))
+
+    def confidence(self, data: str, record: EntityRecord,
+                   context: Optional[str] = None) -> Tuple[float, float]:
+        return self.backend.confidence(data, record, context)
+
+    def cache_identity(self) -> str:
+        return self.backend.cache_identity()
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+from typing import Dict, Iterable, List, Sequence
+
+from TableSinks import TableSink, temp_path
+
+# Формат файла индекса: заголовок, названия столбцов (JSON), смещения строк,
+# таблица ключей, таблицы терминов для групповых запросов и строки (JSON-массивы).
+# Все числа записаны в порядке байтов little-endian, таблицы отсортированы по хешу,
+# поэтому поиск — двоичный поиск прямо в отображенном в память файле.
+MAGIC = b"INVIDX01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQQQQ")
+# Запись таблицы ключей: хеш инвентарного номера, номер строки
+KEY_ENTRY = struct.Struct("<QQ")
+# Запись таблицы терминов: хеш значения, начало и длина списка строк
+TERM_ENTRY = struct.Struct("<QQQ")
+COUNT = struct.Struct("<Q")
+
+# Столбцы для поиска
+KEY_COLUMN = "Инвентарный номер"
+GROUP_COLUMNS = ("Местонахождение", "Ответственное лицо")
+
+# Целое число с плавающей точкой в том виде, как его выводит str(float): "13035.0".
+# Строки с ведущими нулями или несколькими нулями после точки ("004.000000") так
+# не выводятся, это настоящие инвентарные номера, и они не изменяются.
+_FLOAT_INTEGER_REGEX = re.compile(r'^(0|[1-9]\d*)\.0$')
+
+
+def normalize_key(value) -> str:
+    """
+    Приводит инвентарный номер или значение для группового поиска к виду, в котором
+    оно хранится в индексе: без пробелов по краям и без учета регистра. Целые номера,
+    прочитанные pandas из числового столбца (13035.0 или "13035.0"), совпадают
+    с отсканированными ("13035"); строковые номера вроде "004.000000" не изменяются.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    value = str(value).strip().casefold()
+    match = _FLOAT_INTEGER_REGEX.match(value)
+    return match.group(1) if match else value
+
+
+def key_hash(value: str) -> int:
+    """
+    Хеш нормализованного значения, не зависящий от процесса (в отличие от hash()).
+    """
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class InventoryIndexSink(TableSink):
+    """
+    Запись индекса для поиска по инвентарному номеру, месту хранения и ответственному лицу.
+
+    Строки сразу записываются во временный файл, в памяти остаются только смещения
+    и хеши (несколько десятков байт на строку). Файл индекса собирается в prepare
+    во временный файл и в close заменяет прежний атомарно.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Путь к файлу индекса.
+        """
+        self.path = path
+        self.columns = None
+        self._rows_file = None
+        self._prepared = False
+        self._offsets = None
+        self._keys = None
+        self._postings = None
+
+    def open(self, columns: List[str]) -> None:
+        missing = [col for col in (KEY_COLUMN,) + GROUP_COLUMNS if col not in columns]
+        if missing:
+            raise ValueError(f"для индекса нужны столбцы {', '.join(missing)}")
+        self.columns = list(columns)
+        self._key_position = self.columns.index(KEY_COLUMN)
+        self._group_positions = [self.columns.index(col) for col in GROUP_COLUMNS]
+        self._rows_file = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(self.path)))
+        self._offsets = array("Q", [0])
+        self._keys = array("Q")
+        self._postings: List[Dict[int, array]] = [{} for _ in self._group_positions]
+        # Места хранения и ответственные лица повторяются, их хеши вычисляются один раз
+        self._term_hashes: Dict[str, int] = {}
+
+    def write_rows(self, rows: Iterable[Sequence]) -> None:
+        offsets, keys, term_hashes = self._offsets, self._keys, self._term_hashes
+        chunks = []
+        offset = offsets[-1]
+        for row in rows:
+            row_id = len(keys)
+            values = [str(value) for value in row]
+            data = json.dumps(values, ensure_ascii=False).encode("utf-8")
+            chunks.append(data)
+            offset += len(data)
+            offsets.append(offset)
+            keys.append(key_hash(normalize_key(values[self._key_position])))
+            for postings, position in zip(self._postings, self._group_positions):
+                value = values[position]
+                if value == 'Null':
+                    continue
+                term = term_hashes.get(value)
+                if term is None:
+                    term = term_hashes[value] = key_hash(normalize_key(value))
+                row_ids = postings.get(term)
+                if row_ids is None:
+                    row_ids = postings[term] = array("Q")
+                row_ids.append(row_id)
+        self._rows_file.write(b"".join(chunks))
+
+    def prepare(self) -> None:
+        # Индекс собирается во временный файл, прежний файл индекса пока не меняется
+        if self._rows_file is None:
+            return
+        with open(temp_path(self.path), "wb") as file:
+            self._write_index(file)
+        self._rows_file.close()
+        self._rows_file = None
+        self._prepared = True
+
+    def close(self) -> None:
+        try:
+            self.prepare()
+        except BaseException:
+            self.abort()
+            raise
+        if self._prepared:
+            os.replace(temp_path(self.path), self.path)
+            self._prepared = False
+
+    def abort(self) -> None:
+        # Прежний файл индекса остается без изменений
+        if self._rows_file is not None:
+            self._rows_file.close()
+            self._rows_file = None
+        if os.path.exists(temp_path(self.path)):
+            os.remove(temp_path(self.path))
+        self._prepared = False
+
+    def _write_index(self, file) -> None:
+        rows_count = len(self._keys)
+        columns = json.dumps(self.columns, ensure_ascii=False).encode("utf-8")
+
+        keys = sorted(zip(self._keys, range(rows_count)))
+        key_table = COUNT.pack(len(keys)) + b"".join(KEY_ENTRY.pack(hash_, row_id) for hash_, row_id in keys)
+
+        term_tables = []
+        for postings in self._postings:
+            entries, row_ids = [], array("Q")
+            for term in sorted(postings):
+                entries.append(TERM_ENTRY.pack(term, len(row_ids), len(postings[term])))
+                row_ids.extend(postings[term])
+            term_tables.append(COUNT.pack(len(entries)) + b"".join(entries) + row_ids.tobytes())
+
+        # Разделы выравниваются по 8 байт
+        sections = [columns, self._offsets.tobytes(), key_table] + term_tables
+        positions = []
+        position = HEADER.size
+        for section in sections:
+            position += -position % 8
+            positions.append(position)
+            position += len(section)
+        rows_position = position + (-position % 8)
+
+        file.write(HEADER.pack(MAGIC, VERSION, rows_count, positions[0], len(columns),
+                               positions[1], positions[2], positions[3], positions[4], rows_position))
+        for section, section_position in zip(sections, positions):
+            file.write(b"\0" * (section_position - file.tell()))
+            file.write(section)
+        file.write(b"\0" * (rows_position - file.tell()))
+        self._rows_file.seek(0)
+        while chunk := self._rows_file.read(1 << 20):
+            file.write(chunk)
+
+
+class InventoryIndex:
+    """
+    Чтение индекса, записанного InventoryIndexSink.
+
+    Файл отображается в память, открытие не зависит от числа строк: читается только
+    заголовок. Поиск по инвентарному номеру — двоичный поиск по таблице ключей,
+    поиск по месту хранения и ответственному лицу — по таблицам терминов.
+    Найденные строки сверяются с запросом, поэтому совпадение хешей не дает лишних строк.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Путь к файлу индекса.
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._rows_count, columns_position, columns_length, self._offsets_position,
+         self._keys_position, locations_position, persons_position, self._rows_position) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} не является индексом инвентаризации версии {VERSION}")
+        self.columns = json.loads(self._mmap[columns_position:columns_position + columns_length])
+        self._key_position = self.columns.index(KEY_COLUMN)
+        self._term_positions = dict(zip(GROUP_COLUMNS, (locations_position, persons_position)))
+
+    def __len__(self) -> int:
+        return self._rows_count
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "InventoryIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def row(self, row_id: int) -> Dict[str, str]:
+        """
+        Возвращает строку по ее номеру в виде словаря {столбец: значение}.
+        """
+        return dict(zip(self.columns, self._row_values(row_id)))
+
+    def get(self, inventory_number) -> List[Dict[str, str]]:
+        """
+        Возвращает строки с инвентарным номером inventory_number (обычно одну).
+        """
+        key = normalize_key(inventory_number)
+        count = COUNT.unpack_from(self._mmap, self._keys_position)[0]
+        base = self._keys_position + COUNT.size
+        target = key_hash(key)
+        index = self._lower_bound(base, KEY_ENTRY, count, target)
+        rows = []
+        while index < count:
+            hash_, row_id = KEY_ENTRY.unpack_from(self._mmap, base + index * KEY_ENTRY.size)
+            if hash_ != target:
+                break
+            values = self._row_values(row_id)
+            if normalize_key(values[self._key_position]) == key:
+                rows.append(dict(zip(self.columns, values)))
+            index += 1
+        return rows
+
+    def by_location(self, location: str) -> List[Dict[str, str]]:
+        """
+        Возвращает строки с местом хранения location в порядке таблицы.
+        """
+        return self._group("Местонахождение", location)
+
+    def by_responsible_person(self, person: str) -> List[Dict[str, str]]:
+        """
+        Возвращает строки с ответственным лицом person в порядке таблицы.
+        """
+        return self._group("Ответственное лицо", person)
+
+    def _group(self, column: str, value: str) -> List[Dict[str, str]]:
+        term = normalize_key(value)
+        term_hash = key_hash(term)
+        position = self._term_positions[column]
+        count = COUNT.unpack_from(self._mmap, position)[0]
+        base = position + COUNT.size
+        postings_position = base + count * TERM_ENTRY.size
+        column_position = self.columns.index(column)
+        index = self._lower_bound(base, TERM_ENTRY, count, term_hash)
+        rows = []
+        if index < count:
+            hash_, start, length = TERM_ENTRY.unpack_from(self._mmap, base + index * TERM_ENTRY.size)
+            if hash_ == term_hash:
+                row_ids = array("Q")
+                row_ids.frombytes(self._mmap[postings_position + start * 8:postings_position + (start + length) * 8])
+                for row_id in row_ids:
+                    values = self._row_values(row_id)
+                    if normalize_key(values[column_position]) == term:
+                        rows.append(dict(zip(self.columns, values)))
+        return rows
+
+    def _lower_bound(self, base: int, entry: struct.Struct, count: int, target: int) -> int:
+        """
+        Номер первой записи таблицы, хеш которой не меньше target.
+        """
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if entry.unpack_from(self._mmap, base + middle * entry.size)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _row_values(self, row_id: int) -> List[str]:
+        start, end = struct.unpack_from("<QQ", self._mmap, self._offsets_position + row_id * 8)
+        return json.loads(self._mmap[self._rows_position + start:self._rows_position + end])
@@ -0,0 +1,272 @@
+from .NamedEntityRecognizer import NamedEntityRecognizer, EntityRecord
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import json
+import re
+import sqlite3
+
+
+class CacheInfo(NamedTuple):
+    """
+    Статистика кэша.
+
+    Attributes:
+        hits (int): Сколько результатов взято из кэша (в памяти или на диске).
+        misses (int): Сколько текстов пришлось передать распознавателю.
+        disk_hits (int): Сколько из hits найдено только в файле кэша.
+        maxsize (Optional[int]): Максимальный размер кэша в памяти.
+        currsize (int): Текущее количество записей в памяти.
+    """
+    hits: int
+    misses: int
+    disk_hits: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class CachedNamedEntityRecognizer(NamedEntityRecognizer):
+    """
+    Кэширующая обертка над любым распознавателем сущностей.
+
+    Тексты нормализуются (пробельные символы схлопываются, по желанию не учитывается
+    регистр), результаты хранятся в LRU-кэше в памяти и, если указан путь, в файле SQLite,
+    так что они сохраняются между запусками. Записи привязаны к имени распознавателя,
+    его версии и настройкам (cache_identity), поэтому результаты старой версии или
+    другой модели никогда не используются.
+
+    Распознавателю передается уже нормализованный текст, поэтому границы сущностей
+    в EntityRecord относятся к нормализованному тексту.
+    """
+
+    _WHITESPACE_REGEX = re.compile(r'\s+')
+
+    def __init__(self, backend: NamedEntityRecognizer, maxsize: Optional[int] = 100000,
+                 path: Optional[str] = None, ignore_case: bool = False,
+                 backend_name: Optional[str] = None, backend_version: Optional[str] = None) -> None:
+        """
+        Args:
+            backend (NamedEntityRecognizer): Распознаватель, результаты которого кэшируются.
+            maxsize (Optional[int]): Сколько записей хранить в памяти, None — без ограничения,
+                0 — не хранить в памяти. При переполнении вытесняются давно не использованные записи.
+            path (Optional[str]): Путь к файлу SQLite для хранения результатов между запусками.
+            ignore_case (bool): Не учитывать регистр при поиске в кэше. Распознавателю по-прежнему
+                передается текст в исходном регистре, поэтому включать стоит только для
+                распознавателей, результат которых не зависит от регистра.
+            backend_name (Optional[str]): Имя распознавателя в ключах кэша, по умолчанию имя класса.
+            backend_version (Optional[str]): Версия распознавателя в ключах кэша,
+                по умолчанию backend.cache_identity() (VERSION и настройки модели).
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize не может быть отрицательным")
+        self.backend = backend
+        self.maxsize = maxsize
+        self.path = path
+        self.ignore_case = ignore_case
+        self.backend_name = backend_name or type(backend).__name__
+        self.backend_version = str(backend_version or backend.cache_identity())
+        self.VERSION = str(backend_version or backend.VERSION)
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._memory = OrderedDict()
+        self._connection = None
+        if path is not None:
+            self._connection = self._connect(path)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        """
+        Открывает файл кэша и создает таблицу, если ее еще нет.
+        """
+        # Файл может использоваться одновременно несколькими процессами
+        connection = sqlite3.connect(path, timeout=30)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS ner_cache ("
+            "backend TEXT NOT NULL, version TEXT NOT NULL, method TEXT NOT NULL, "
+            "key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (backend, version, method, key))"
+        )
+        connection.commit()
+        return connection
+
+    def cache_identity(self) -> str:
+        # Результаты обертки совпадают с результатами распознавателя
+        return f"{self.backend_name}:{self.backend_version}"
+
+    def normalize(self, data: str) -> str:
+        """
+        Нормализует текст: схлопывает пробельные символы и убирает их по краям.
+        """
+        return self._WHITESPACE_REGEX.sub(' ', data).strip()
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Возвращает статистику попаданий и промахов кэша.
+        """
+        return CacheInfo(self.hits, self.misses, self.disk_hits, self.maxsize, len(self._memory))
+
+    def cache_clear(self) -> None:
+        """
+        Очищает кэш в памяти и обнуляет статистику. Файл кэша не изменяется.
+        """
+        self._memory.clear()
+        self.hits = self.misses = self.disk_hits = 0
+
+    def close(self) -> None:
+        """
+        Закрывает файл кэша.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def get_location(self, data: str) -> str:
+        return (await self.get_locations([data]))[0]
+
+    async def get_responsible_person(self, data: str) -> str:
+        return (await self.get_responsible_persons([data]))[0]
+
+    async def get_locations(self, data: List[str]) -> List[str]:
+        return await self._cached_batch("get_locations", data, self.backend.get_locations)
+
+    async def get_responsible_persons(self, data: List[str]) -> List[str]:
+        return await self._cached_batch("get_responsible_persons", data, self.backend.get_responsible_persons)
+
+    async def extract_all(self, data: str, context: Optional[str] = None) -> EntityRecord:
+        return (await self.extract_all_batch([data], None if context is None else [context]))[0]
+
+    async def extract_all_batch(self, data: List[str],
+                                contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        if contexts is None:
+            contexts = [None] * len(data)
+        normalized_contexts = [None if context is None else self.normalize(context) for context in contexts]
+
+        async def extract(texts: List[str], batch_contexts: List[Optional[str]]) -> List[EntityRecord]:
+            if all(context is None for context in batch_contexts):
+                return await self.backend.extract_all_batch(texts)
+            return await self.backend.extract_all_batch(
+                texts, ['' if context is None else context for context in batch_contexts]
+            )
+
+        records = await self._cached_batch("extract_all", data, extract, normalized_contexts)
+        # Из файла кэша записи приходят в виде списков
+        return [
+            EntityRecord(
+                location, person,
+                tuple(location_span) if location_span is not None else None,
+                tuple(person_span) if person_span is not None else None,
+            )
+            for location, person, location_span, person_span in records
+        ]
+
+    def confidence(self, data: str, record: EntityRecord,
+                   context: Optional[str] = None) -> Tuple[float, float]:
+        return self.backend.confidence(data, record, context)
+
+    async def _cached_batch(self, method: str, data: List[str], compute,
+                            contexts: Optional[List[Optional[str]]] = None) -> list:
+        """
+        Возвращает результаты из кэша, а для отсутствующих в нем текстов вызывает
+        compute один раз на каждый уникальный нормализованный текст.
+        """
+        texts = [self.normalize(item) for item in data]
+        if contexts is None:
+            keys = [text.casefold() if self.ignore_case else text for text in texts]
+        else:
+            keys = [
+                json.dumps([text, context], ensure_ascii=False)
+                for text, context in zip(texts, contexts)
+            ]
+            if self.ignore_case:
+                keys = [key.casefold() for key in keys]
+
+        results: Dict[str, object] = {}
+        missing: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key in results or key in missing:
+                continue
+            memory_key = (method, key)
+            if memory_key in self._memory:
+                self._memory.move_to_end(memory_key)
+                results[key] = self._memory[memory_key]
+            else:
+                missing[key] = i
+
+        if missing and self._connection is not None:
+            for key, value in self._load(method, list(missing)).items():
+                results[key] = value
+                self._remember(method, key, value)
+                del missing[key]
+                self.disk_hits += 1
+
+        if missing:
+            indexes = list(missing.values())
+            computed = await compute(
+                [texts[i] for i in indexes],
+                *([] if contexts is None else [[contexts[i] for i in indexes]]),
+            )
+            computed = dict(zip(missing, computed))
+            for key, value in computed.items():
+                results[key] = value
+                self._remember(method, key, value)
+            self._store(method, computed)
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        return [results[key] for key in keys]
+
+    def _remember(self, method: str, key: str, value) -> None:
+        """
+        Добавляет запись в кэш в памяти, вытесняя давно не использованные записи.
+        """
+        if self.maxsize == 0:
+            return
+        self._memory[(method, key)] = value
+        self._memory.move_to_end((method, key))
+        if self.maxsize is not None and len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _load(self, method: str, keys: List[str]) -> dict:
+        """
+        Загружает записи из файла кэша.
+        """
+        found = {}
+        # SQLite ограничивает количество параметров в одном запросе
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            rows = self._connection.execute(
+                "SELECT key, value FROM ner_cache WHERE backend = ? AND version = ? AND method = ? "
+                "AND key IN (" + ", ".join("?" * len(part)) + ")",
+                [self.backend_name, self.backend_version, method, *part],
+            )
+            for key, value in rows:
+                found[key] = json.loads(value)
+        return found
+
+    def _store(self, method: str, values: dict) -> None:
+        """
+        Сохраняет записи в файл кэша одной транзакцией.
+        """
+        if self._connection is None or not values:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO ner_cache (backend, version, method, key, value) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (self.backend_name, self.backend_version, method, key, json.dumps(value, ensure_ascii=False))
+                    for key, value in values.items()
+                ],
+            )
+
+    def __getstate__(self) -> dict:
+        # Соединение с SQLite нельзя передать в другой процесс, оно открывается заново
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_memory"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.path is not None:
+            self._connection = self._connect(self.path)
@@ -0,0 +1,134 @@
+from .NamedEntityRecognizer import NamedEntityRecognizer, EntityRecord, recognizer_identity
+from typing import List, NamedTuple, Optional, Sequence, Union
+import time
+
+
+class TierInfo(NamedTuple):
+    """
+    Статистика одного уровня каскада.
+
+    Attributes:
+        name (str): Имя класса распознавателя.
+        rows (int): Сколько текстов передано уровню.
+        resolved (int): Для скольких из них после уровня обе сущности достигли порога.
+        seconds (float): Суммарное время вызовов уровня.
+    """
+    name: str
+    rows: int
+    resolved: int
+    seconds: float
+
+
+class CascadeInfo(NamedTuple):
+    """
+    Статистика каскада: уровни по порядку и число текстов, не решенных ни одним уровнем.
+    """
+    tiers: List[TierInfo]
+    unresolved: int
+
+
+class CascadingNamedEntityRecognizer(NamedEntityRecognizer):
+    """
+    Каскад распознавателей от дешевого к дорогому.
+
+    Все тексты обрабатывает первый уровень (по умолчанию регулярные выражения). Следующему
+    уровню передаются только тексты, в которых уверенность (NamedEntityRecognizer.confidence)
+    хотя бы в одной сущности ниже порога. Для каждой сущности остается результат уровня,
+    который был в ней наиболее уверен. Каждый уровень вызывается одним пакетом на все
+    переданные ему тексты, поэтому пакетные оптимизации spaCy и LLM сохраняются.
+    """
+
+    DEFAULT_TIERS = ("regex", "spacy", "llm")
+
+    def __init__(self, tiers: Optional[Sequence[Union[NamedEntityRecognizer, str]]] = None,
+                 thresholds: Union[float, Sequence[float]] = 0.5) -> None:
+        """
+        Args:
+            tiers (Optional[Sequence[Union[NamedEntityRecognizer, str]]]): Распознаватели или их имена
+                в RecognizerRegistry в порядке возрастания стоимости, по умолчанию DEFAULT_TIERS.
+            thresholds (Union[float, Sequence[float]]): Порог уверенности, ниже которого текст
+                передается следующему уровню: одно число для всех уровней или по числу на каждый
+                уровень, кроме последнего. Для последнего уровня используется последний порог,
+                он определяет только статистику.
+        """
+        from .RecognizerRegistry import create_recognizer
+        tiers = self.DEFAULT_TIERS if tiers is None else tiers
+        if not tiers:
+            raise ValueError("каскад должен содержать хотя бы один распознаватель")
+        self.tiers = [create_recognizer(tier) if isinstance(tier, str) else tier for tier in tiers]
+        if isinstance(thresholds, (int, float)):
+            thresholds = [thresholds] * max(len(self.tiers) - 1, 1)
+        if len(thresholds) != max(len(self.tiers) - 1, 1):
+            raise ValueError("порогов должно быть на один меньше, чем уровней каскада")
+        self.thresholds = list(thresholds) + [thresholds[-1]]
+        # Результаты зависят от всех уровней и порогов
+        self.VERSION = "1;" + ";".join(
+            f"{recognizer_identity(tier)}:{threshold}"
+            for tier, threshold in zip(self.tiers, self.thresholds)
+        )
+        self._rows = [0] * len(self.tiers)
+        self._resolved = [0] * len(self.tiers)
+        self._seconds = [0.0] * len(self.tiers)
+        self._unresolved = 0
+
+    def cascade_info(self) -> CascadeInfo:
+        tiers = [
+            TierInfo(type(tier).__name__, rows, resolved, seconds)
+            for tier, rows, resolved, seconds in zip(self.tiers, self._rows, self._resolved, self._seconds)
+        ]
+        return CascadeInfo(tiers, self._unresolved)
+
+    async def get_location(self, data: str) -> str:
+        return (await self.extract_all_batch([data]))[0].location
+
+    async def get_responsible_person(self, data: str) -> str:
+        return (await self.extract_all_batch([data]))[0].responsible_person
+
+    async def get_locations(self, data: List[str]) -> List[str]:
+        return [record.location for record in await self.extract_all_batch(data)]
+
+    async def get_responsible_persons(self, data: List[str]) -> List[str]:
+        return [record.responsible_person for record in await self.extract_all_batch(data)]
+
+    async def extract_all(self, data: str, context: Optional[str] = None) -> EntityRecord:
+        return (await self.extract_all_batch([data], None if context is None else [context]))[0]
+
+    async def extract_all_batch(self, data: List[str],
+                                contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        records: List[Optional[EntityRecord]] = [None] * len(data)
+        # Уверенность в месте хранения и в ответственном лице для каждого текста
+        confidences = [(-1.0, -1.0)] * len(data)
+        pending = list(range(len(data)))
+        for level, (tier, threshold) in enumerate(zip(self.tiers, self.thresholds)):
+            if not pending:
+                break
+            start = time.perf_counter()
+            tier_records = await tier.extract_all_batch(
+                [data[i] for i in pending],
+                None if contexts is None else [contexts[i] for i in pending],
+            )
+            self._seconds[level] += time.perf_counter() - start
+
+            for i, record in zip(pending, tier_records):
+                context = None if contexts is None else contexts[i]
+                location_confidence, person_confidence = tier.confidence(data[i], record, context)
+                old_location_confidence, old_person_confidence = confidences[i]
+                old = records[i] if records[i] is not None else record
+                if location_confidence > old_location_confidence:
+                    old = old._replace(location=record.location, location_span=record.location_span)
+                else:
+                    location_confidence = old_location_confidence
+                if person_confidence > old_person_confidence:
+                    old = old._replace(responsible_person=record.responsible_person,
+                                       responsible_person_span=record.responsible_person_span)
+                else:
+                    person_confidence = old_person_confidence
+                records[i] = old
+                confidences[i] = (location_confidence, person_confidence)
+
+            escalated = [i for i in pending if min(confidences[i]) < threshold]
+            self._rows[level] += len(pending)
+            self._resolved[level] += len(pending) - len(escalated)
+            pending = escalated
+        self._unresolved += len(pending)
+        return records
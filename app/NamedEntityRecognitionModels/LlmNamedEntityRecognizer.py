@@ -0,0 +1,237 @@
+from .NamedEntityRecognizer import NamedEntityRecognizer, EntityRecord
+from typing import Dict, List, Optional
+import asyncio
+import json
+
+# Системное сообщение модели для запроса одной сущности, см. также llama_test.py
+SYSTEM_PROMPT = """
+Ты анализируешь текст на Русском языке и выделяешь информацию, наиболее подходящую под переданный тебе запрос. Твой единственный фокус — извлечение данных из текста, без домыслов, догадок или интерпретации. Если информация не найдена, возвращай 'Null'.
+
+Формат ответа:
+1. Выводи только найденную часть текста, которая максимально соответствует запросу.
+2. Если подходящая информация отсутствует, возвращай 'Null'.
+3. Не добавляй комментариев, пояснений или текста вне контекста извлечения.
+
+Примеры:
+1. Текст: "к.301 Кравченко А.В. расписка, Невского, ИЛ"
+Запрос: "ответственное лицо"
+Ответ: "Кравченко А.В."
+2. Текст: "к.128 Интернет"
+Запрос: "кабинет"
+Ответ: "128"
+3. Текст: "к.123 Психдиспансер"
+Запрос: "ответственное лицо"
+Ответ: "Null"
+"""
+
+# Системное сообщение модели для запроса BATCH_PROMPT
+BATCH_SYSTEM_PROMPT = """
+Ты извлекаешь данные из строк инвентарной ведомости на Русском языке и отвечаешь только JSON.
+Выписывай найденную часть текста без изменений, без домыслов и пояснений. Если сущности нет, указывай 'Null'.
+"""
+
+# Запрос для нескольких строк сразу; строки передаются в виде JSON
+BATCH_PROMPT = """
+Для каждой строки из JSON-массива ниже выдели номер кабинета (location) и ответственное лицо (responsible_person).
+Номер кабинета ищи в полях text и name, ответственное лицо — только в поле text.
+Если сущности нет, укажи 'Null'.
+Ответь только JSON-объектом вида {{"rows": [{{"id": 0, "location": "301", "responsible_person": "Кравченко А.В."}}]}},
+в котором есть ответ для каждого id.
+
+Строки:
+{rows}
+"""
+
+
+class LlmNamedEntityRecognizer(NamedEntityRecognizer):
+    """
+    Распознаватель сущностей на основе языковой модели, запущенной в Ollama.
+
+    Пакет текстов делится на группы по rows_per_prompt строк, каждая группа отправляется
+    одним запросом, в котором модель возвращает место хранения и ответственное лицо
+    для всех строк в виде JSON. Строки, ответ для которых не удалось разобрать,
+    запрашиваются по одной: отдельно место хранения и ответственное лицо.
+
+    Одновременно выполняется не больше max_concurrency запросов, запрос, который
+    не уложился в timeout или завершился ошибкой, повторяется до retries раз
+    с экспоненциально растущей паузой. Пакет ollama импортируется при первом запросе.
+    """
+
+    VERSION = "3"
+
+    def __init__(self, model: str = "llama2", host: Optional[str] = None, client=None,
+                 rows_per_prompt: int = 20, max_concurrency: int = 4, timeout: float = 120.0,
+                 retries: int = 3, backoff: float = 0.5) -> None:
+        """
+        Args:
+            model (str): Имя модели в Ollama.
+            host (Optional[str]): Адрес сервера Ollama, по умолчанию адрес ollama.AsyncClient.
+            client: Клиент с методом chat, как у ollama.AsyncClient; по умолчанию создается
+                при первом запросе в каждом цикле событий.
+            rows_per_prompt (int): Сколько строк отправляется модели в одном запросе.
+            max_concurrency (int): Сколько запросов к модели выполняется одновременно.
+            timeout (float): Время ожидания ответа на один запрос в секундах.
+            retries (int): Сколько раз повторяется запрос после ошибки или истечения timeout.
+            backoff (float): Пауза перед первым повтором в секундах, перед каждым следующим
+                она удваивается.
+        """
+        if rows_per_prompt < 1:
+            raise ValueError("rows_per_prompt должен быть положительным")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency должен быть положительным")
+        self.model = model
+        self.host = host
+        self.rows_per_prompt = rows_per_prompt
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._client = client
+        # Клиент по умолчанию и ограничитель запросов привязаны к циклу событий
+        self._loop = None
+        self._loop_client = None
+        self._semaphore = None
+
+    def __getstate__(self) -> dict:
+        # Объекты, привязанные к циклу событий, в другой процесс не передаются
+        state = self.__dict__.copy()
+        state.update(_loop=None, _loop_client=None, _semaphore=None)
+        return state
+
+    def cache_identity(self) -> str:
+        # Группировка строк в запросе тоже влияет на ответы модели
+        return f"{self.VERSION};model={self.model};rows_per_prompt={self.rows_per_prompt}"
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._loop_client = None
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        self._bind_loop()
+        if self._loop_client is None:
+            from ollama import AsyncClient
+            self._loop_client = AsyncClient(host=self.host)
+        return self._loop_client
+
+    async def _chat(self, prompt: str, json_format: bool = False) -> str:
+        """
+        Отправляет запрос модели с ограничением числа одновременных запросов,
+        ограничением времени и повторами. Запрос с json_format отправляется
+        с системным сообщением BATCH_SYSTEM_PROMPT, остальные — с SYSTEM_PROMPT.
+        """
+        self._bind_loop()
+        messages = [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT if json_format else SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+        options = {"model": self.model, "messages": messages, "options": {"temperature": 0}}
+        if json_format:
+            options["format"] = "json"
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await asyncio.wait_for(self.client.chat(**options), self.timeout)
+                return response["message"]["content"]
+            except Exception:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def _ask(self, data: str, query: str) -> str:
+        """
+        Запрашивает у модели сущность query в тексте data.
+        """
+        return self._normalize_answer(await self._chat(f'Текст: "{data}"\nЗапрос: "{query}"'))
+
+    @staticmethod
+    def _normalize_answer(answer) -> str:
+        if not isinstance(answer, str):
+            return 'Null'
+        answer = answer.strip().strip('"\'«»').strip()
+        if not answer or answer.lower() in ("null", "none", "нет"):
+            return 'Null'
+        return answer
+
+    @staticmethod
+    def _parse_batch_answer(answer: str, count: int) -> Dict[int, EntityRecord]:
+        """
+        Разбирает ответ на запрос BATCH_PROMPT.
+
+        Return:
+            Записи для строк, ответ для которых удалось разобрать, по их номеру в группе.
+        """
+        try:
+            parsed = json.loads(answer)
+        except ValueError:
+            return {}
+        rows = parsed.get("rows") if isinstance(parsed, dict) else parsed
+        if not isinstance(rows, list):
+            return {}
+        records = {}
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            index = row.get("id")
+            if not isinstance(index, int) or not 0 <= index < count or index in records:
+                continue
+            if "location" not in row or "responsible_person" not in row:
+                continue
+            values = [row["location"], row["responsible_person"]]
+            # Номер кабинета модель может вернуть числом ("location": 301)
+            values = [str(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+                      for value in values]
+            # Строка с ответом другого типа запрашивается отдельно
+            if not all(isinstance(value, str) or value is None for value in values):
+                continue
+            records[index] = EntityRecord(*(LlmNamedEntityRecognizer._normalize_answer(value) for value in values))
+        return records
+
+    async def _extract_group(self, data: List[str], contexts: Optional[List[str]]) -> List[EntityRecord]:
+        """
+        Извлекает сущности из группы строк одним запросом, строки без разобранного
+        ответа запрашиваются по одной.
+        """
+        rows = [
+            {"id": i, "text": item} if contexts is None else {"id": i, "text": item, "name": contexts[i]}
+            for i, item in enumerate(data)
+        ]
+        prompt = BATCH_PROMPT.format(rows=json.dumps(rows, ensure_ascii=False))
+        records = self._parse_batch_answer(await self._chat(prompt, json_format=True), len(data))
+
+        missing = [i for i in range(len(data)) if i not in records]
+        fallback = await asyncio.gather(*(
+            NamedEntityRecognizer.extract_all(self, data[i], None if contexts is None else contexts[i])
+            for i in missing
+        ))
+        records.update(zip(missing, fallback))
+        return [records[i] for i in range(len(data))]
+
+    async def get_location(self, data: str) -> str:
+        return await self._ask(data, "кабинет")
+
+    async def get_responsible_person(self, data: str) -> str:
+        return await self._ask(data, "ответственное лицо")
+
+    async def get_locations(self, data: List[str]) -> List[str]:
+        return [record.location for record in await self.extract_all_batch(data)]
+
+    async def get_responsible_persons(self, data: List[str]) -> List[str]:
+        return [record.responsible_person for record in await self.extract_all_batch(data)]
+
+    async def extract_all(self, data: str, context: Optional[str] = None) -> EntityRecord:
+        return (await self.extract_all_batch([data], None if context is None else [context]))[0]
+
+    async def extract_all_batch(self, data: List[str],
+                                contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        size = self.rows_per_prompt
+        groups = await asyncio.gather(*(
+            self._extract_group(data[i:i + size], None if contexts is None else contexts[i:i + size])
+            for i in range(0, len(data), size)
+        ))
+        return [record for group in groups for record in group]
@@ -1,8 +1,55 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class EntityRecord(NamedTuple):
+    """
+    Сущности, извлеченные из одного текста.
+
+    Attributes:
+        location (str): Место хранения или 'Null'.
+        responsible_person (str): Ответственное лицо или 'Null'.
+        location_span (Optional[Tuple[int, int]]): Границы места хранения в тексте
+            data + ' ' + context, None если место не найдено или границы неизвестны.
+        responsible_person_span (Optional[Tuple[int, int]]): Границы ответственного лица
+            в тексте data, None если лицо не найдено или границы неизвестны.
+    """
+    location: str
+    responsible_person: str
+    location_span: Optional[Tuple[int, int]] = None
+    responsible_person_span: Optional[Tuple[int, int]] = None
+
+
+def recognizer_identity(recognizer: "NamedEntityRecognizer") -> str:
+    """
+    Полное описание распознавателя для ключей кэша и отпечатков строк:
+    имя класса и NamedEntityRecognizer.cache_identity().
+    """
+    return f"{type(recognizer).__name__}:{recognizer.cache_identity()}"
+
 
 class NamedEntityRecognizer(ABC):    
+    # Версия реализации распознавателя. Должна меняться при любом изменении,
+    # которое влияет на результаты, чтобы не смешивать их с сохраненными в кэше.
+    VERSION = "1"
+
+    def cache_identity(self) -> str:
+        """
+        Версия распознавателя вместе с настройками, от которых зависят результаты
+        (например, имя модели). Распознаватели с разными cache_identity не должны
+        использовать результаты друг друга из кэша и прошлых запусков.
+
+        Реализация по умолчанию возвращает VERSION. Наследники с такими настройками
+        и обертки над другими распознавателями должны переопределить этот метод.
+
+        Returns:
+            str: Строка, однозначно описывающая результаты распознавателя.
+        """
+        return self.VERSION
+
     @abstractmethod
-    async def get_location(data: str) -> str:
+    async def get_location(self, data: str) -> str:
         """
         Извлечение места хранения из текста.
 
@@ -22,7 +69,7 @@ class NamedEntityRecognizer(ABC):
         pass
 
     @abstractmethod
-    async def get_responsible_person(data: str) -> str:
+    async def get_responsible_person(self, data: str) -> str:
         """
         Извлечение информации о ответственном лице из текста.
 
@@ -42,3 +89,109 @@ class NamedEntityRecognizer(ABC):
             - Метод должен строго извлекать данные, без выдумок или домыслов.
         """
         pass
+
+    async def get_locations(self, data: List[str]) -> List[str]:
+        """
+        Извлечение мест хранения из списка текстов.
+
+        Реализация по умолчанию вызывает get_location для каждого текста по очереди.
+        Наследники, которые умеют обрабатывать несколько текстов за один проход
+        (например, за один запрос к модели), должны переопределить этот метод.
+
+        Args:
+            data (List[str]): Тексты, содержащие информацию о месте хранения.
+
+        Returns:
+            List[str]: Места хранения в том же порядке, что и тексты,
+                       'Null' для текстов без информации о месте хранения.
+        """
+        return [await self.get_location(item) for item in data]
+
+    async def get_responsible_persons(self, data: List[str]) -> List[str]:
+        """
+        Извлечение ответственных лиц из списка текстов.
+
+        Реализация по умолчанию вызывает get_responsible_person для каждого текста по очереди.
+        Наследники, которые умеют обрабатывать несколько текстов за один проход,
+        должны переопределить этот метод.
+
+        Args:
+            data (List[str]): Тексты, из которых нужно выделить данные об ответственных лицах.
+
+        Returns:
+            List[str]: Ответственные лица в том же порядке, что и тексты,
+                       'Null' для текстов без информации об ответственном лице.
+        """
+        return [await self.get_responsible_person(item) for item in data]
+
+    async def extract_all(self, data: str, context: Optional[str] = None) -> EntityRecord:
+        """
+        Извлечение места хранения и ответственного лица из текста за один вызов.
+
+        Место хранения ищется в тексте data + ' ' + context (например, в описании
+        местонахождения вместе с наименованием объекта), ответственное лицо — только в data.
+        Реализация по умолчанию одновременно вызывает get_location и get_responsible_person
+        и не заполняет границы сущностей. Наследники, которые могут найти обе сущности
+        за один проход по тексту, должны переопределить этот метод.
+
+        Args:
+            data (str): Текст, содержащий информацию о месте хранения и ответственном лице.
+            context (Optional[str]): Дополнительный текст, в котором ищется только место хранения.
+
+        Returns:
+            EntityRecord: Извлеченные сущности.
+        """
+        location_text = data if context is None else data + ' ' + context
+        location, person = await asyncio.gather(
+            self.get_location(location_text),
+            self.get_responsible_person(data),
+        )
+        return EntityRecord(location, person)
+
+    async def extract_all_batch(self, data: List[str],
+                                contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        """
+        Пакетная версия extract_all.
+
+        Реализация по умолчанию одновременно вызывает пакетные методы get_locations
+        и get_responsible_persons, чтобы сохранить их оптимизации.
+
+        Args:
+            data (List[str]): Тексты с информацией о месте хранения и ответственном лице.
+            contexts (Optional[List[str]]): Дополнительные тексты для поиска места хранения,
+                по одному на каждый текст из data.
+
+        Returns:
+            List[EntityRecord]: Извлеченные сущности в том же порядке, что и тексты.
+        """
+        if contexts is None:
+            location_texts = list(data)
+        else:
+            location_texts = [item + ' ' + context for item, context in zip(data, contexts)]
+        locations, persons = await asyncio.gather(
+            self.get_locations(location_texts),
+            self.get_responsible_persons(data),
+        )
+        return [EntityRecord(location, person) for location, person in zip(locations, persons)]
+
+    def confidence(self, data: str, record: EntityRecord,
+                   context: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Уверенность распознавателя в сущностях, которые он извлек из текста.
+
+        Используется CascadingNamedEntityRecognizer, чтобы решить, передавать ли текст
+        следующему, более дорогому распознавателю. Реализация по умолчанию считает
+        найденную сущность надежной, а 'Null' — ненадежным результатом.
+
+        Args:
+            data (str): Текст, переданный в extract_all.
+            record (EntityRecord): Результат extract_all для этого текста.
+            context (Optional[str]): Дополнительный текст, переданный в extract_all.
+
+        Returns:
+            Tuple[float, float]: Уверенность от 0 до 1 в месте хранения и в ответственном лице.
+        """
+        return (
+            0.0 if record.location == 'Null' else 1.0,
+            0.0 if record.responsible_person == 'Null' else 1.0,
+        )
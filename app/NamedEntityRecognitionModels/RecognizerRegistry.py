@@ -0,0 +1,78 @@
+"""
+Реестр распознавателей сущностей по имени.
+
+Модуль распознавателя импортируется только при первом создании распознавателя,
+поэтому выбор, например, "regex" не загружает spaCy или клиент Ollama.
+"""
+import importlib
+from typing import Dict, List
+
+from .NamedEntityRecognizer import NamedEntityRecognizer
+
+# Имя распознавателя -> "модуль:класс" внутри пакета NamedEntityRecognitionModels
+RECOGNIZERS: Dict[str, str] = {
+    "regex": "RegexNamedEntityRecognizer:RegexNamedEntityRecognizer",
+    "spacy": "SpacyNamedEntityRecognizer:SpacyNamedEntityRecognizer",
+    "llm": "LlmNamedEntityRecognizer:LlmNamedEntityRecognizer",
+    "cached": "CachedNamedEntityRecognizer:CachedNamedEntityRecognizer",
+    "cascade": "CascadingNamedEntityRecognizer:CascadingNamedEntityRecognizer",
+}
+
+# Распознаватели-обертки; имя оборачиваемого распознавателя указывается через двоеточие,
+# например "cached:spacy"
+WRAPPERS = {"cached": "regex"}
+
+
+def register_recognizer(name: str, target: str) -> None:
+    """
+    Регистрирует распознаватель.
+
+    Args:
+        name (str): Имя распознавателя.
+        target (str): "модуль:класс"; модуль ищется сначала в пакете
+            NamedEntityRecognitionModels, затем как абсолютный.
+    """
+    RECOGNIZERS[name] = target
+
+
+def available_recognizers() -> List[str]:
+    return list(RECOGNIZERS)
+
+
+def get_recognizer_class(name: str) -> type:
+    """
+    Импортирует и возвращает класс распознавателя по имени.
+    """
+    target = RECOGNIZERS.get(name)
+    if target is None:
+        raise ValueError(f"неизвестный распознаватель: {name}, доступны: {', '.join(RECOGNIZERS)}")
+    module_name, class_name = target.split(":")
+    try:
+        module = importlib.import_module("." + module_name, __package__)
+    except ModuleNotFoundError as error:
+        if error.name != f"{__package__}.{module_name}":
+            raise
+        module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def create_recognizer(name: str, **options) -> NamedEntityRecognizer:
+    """
+    Создает распознаватель по имени.
+
+    Args:
+        name (str): Имя распознавателя. Для оберток через двоеточие можно указать
+            оборачиваемый распознаватель: "cached:spacy".
+        **options: Параметры конструктора распознавателя.
+    Return:
+        Новый распознаватель.
+    """
+    name, _, inner = name.partition(":")
+    if name in WRAPPERS:
+        backend = options.pop("backend", None) or inner or WRAPPERS[name]
+        if isinstance(backend, str):
+            backend = create_recognizer(backend)
+        options["backend"] = backend
+    elif inner:
+        raise ValueError(f"распознаватель {name} не оборачивает другие распознаватели")
+    return get_recognizer_class(name)(**options)
@@ -1,7 +1,34 @@
-from .NamedEntityRecognizer import NamedEntityRecognizer
+from .NamedEntityRecognizer import NamedEntityRecognizer, EntityRecord
+from typing import List, Optional, Tuple
 import re
 
 class RegexNamedEntityRecognizer(NamedEntityRecognizer):
+    # Шаблон номера кабинета, вторая группа содержит сам номер (регистр не учитывается)
+    CABINET_PATTERN = r'\b((?:(?:к\.|каб\.)\s*)+(\d{3}[-]?[А-ЯA-Zа-яa-z]?))'
+    # Шаблон фамилии с инициалами или полного имени
+    PERSON_PATTERN = r'\b[A-ZА-Я][a-zа-я]+\s*(?:[A-ZА-Я](?:\.|[a-zа-я]+)?)?\s*(?:[A-ZА-Я](?:\.|[a-zа-я]+)?)?'
+
+    # Шаблоны компилируются один раз при импорте модуля
+    _CABINET_REGEX = re.compile(CABINET_PATTERN, re.IGNORECASE)
+    _PERSON_REGEX = re.compile(PERSON_PATTERN)
+    # Хвост строки из одних префиксов кабинета ("к.", "каб."), номер к которым
+    # может находиться уже в дополнительной строке
+    _CABINET_TAIL_REGEX = re.compile(r'(?:(?:к\.|каб\.)\s*)+\Z', re.IGNORECASE)
+    # Находит ближайшую позицию, с которой начинается кабинет или ответственное лицо.
+    # Оба шаблона стоят внутри опережающих проверок, поэтому текст не поглощается,
+    # и поиск второй сущности продолжается с найденной позиции. Начальная проверка
+    # первого символа позволяет движку быстро пропускать неподходящие позиции.
+    _FUSED_REGEX = re.compile(
+        r'(?=[кКA-ZА-Я])(?:(?=(?i:' + CABINET_PATTERN + r'))|(?=(' + PERSON_PATTERN + r')))'
+    )
+    # Инициалы перед фамилией ("И.И.Иванов"): шаблон ответственного лица находит только фамилию
+    _INITIALS_FIRST_REGEX = re.compile(r'\b[A-ZА-Я]\.\s*(?:[A-ZА-Я]\.\s*)?[A-ZА-Я][a-zа-я]+')
+
+    # Уверенность в результатах, см. confidence
+    AMBIGUOUS_LOCATION_CONFIDENCE = 0.4
+    SINGLE_WORD_PERSON_CONFIDENCE = 0.6
+    INITIALS_FIRST_PERSON_CONFIDENCE = 0.2
+
     @staticmethod
     async def get_location(data: str) -> str:
         """
@@ -18,13 +45,13 @@ class RegexNamedEntityRecognizer(NamedEntityRecognizer):
             str: Номер кабинета или 'Null', если номер не найден.
         """
 
-        cabinet_pattern = re.compile(r'\b((?:(?:к\.|каб\.)\s*)+(\d{3}[-]?[А-ЯA-Zа-яa-z]?))', re.IGNORECASE)
-        find_cabinet_number = re.findall(cabinet_pattern, data)
+        cabinet_pattern = RegexNamedEntityRecognizer._CABINET_REGEX
+        find_cabinet_number = cabinet_pattern.search(data)
 
         # Если найден номер кабинета, возвращаем его.
         # Если нет, возвращаем 'Null'.
         if find_cabinet_number:
-            cabinet_number = find_cabinet_number[0][1]
+            cabinet_number = find_cabinet_number.group(2)
             return cabinet_number.strip()
         return 'Null'
 
@@ -43,9 +70,169 @@ class RegexNamedEntityRecognizer(NamedEntityRecognizer):
             str: Имя ответственного лица или 'Null', если имя не найдено.
         """
 
-        name_pattern = r'\b[A-ZА-Я][a-zа-я]+\s*(?:[A-ZА-Я](?:\.|[a-zа-я]+)?)?\s*(?:[A-ZА-Я](?:\.|[a-zа-я]+)?)?'
-        person_match = re.search(name_pattern, data)
+        name_pattern = RegexNamedEntityRecognizer._PERSON_REGEX
+        person_match = name_pattern.search(data)
 
         # Если найдено имя, возвращаем его. Если нет, возвращаем 'Null'.
         person = person_match.group(0) if person_match else 'Null'
-        return person.strip()
\ No newline at end of file
+        return person.strip()
+
+    @staticmethod
+    async def get_locations(data: List[str]) -> List[str]:
+        """
+        Пакетная версия get_location.
+
+        Аргументы:
+            data (List[str]): Строки, из которых нужно извлечь номера кабинетов.
+
+        Возвращает:
+            List[str]: Номера кабинетов или 'Null' в том же порядке, что и строки.
+        """
+
+        cabinet_pattern = RegexNamedEntityRecognizer._CABINET_REGEX
+        locations = []
+        for item in data:
+            cabinet_match = cabinet_pattern.search(item)
+            locations.append(cabinet_match.group(2).strip() if cabinet_match else 'Null')
+        return locations
+
+    @staticmethod
+    async def get_responsible_persons(data: List[str]) -> List[str]:
+        """
+        Пакетная версия get_responsible_person.
+
+        Аргументы:
+            data (List[str]): Строки, из которых нужно извлечь имена ответственных лиц.
+
+        Возвращает:
+            List[str]: Имена ответственных лиц или 'Null' в том же порядке, что и строки.
+        """
+
+        name_pattern = RegexNamedEntityRecognizer._PERSON_REGEX
+        persons = []
+        for item in data:
+            person_match = name_pattern.search(item)
+            persons.append(person_match.group(0).strip() if person_match else 'Null')
+        return persons
+
+    @staticmethod
+    async def extract_all(data: str, context: Optional[str] = None) -> EntityRecord:
+        """
+        Метод для извлечения номера кабинета и ответственного лица за один проход по строке.
+
+        Сначала ищется ближайшая позиция, с которой начинается любая из сущностей,
+        затем поиск второй сущности продолжается с этой позиции, поэтому строка
+        просматривается один раз. Номер кабинета ищется в data + ' ' + context,
+        но дополнительная строка просматривается, только если в data кабинета нет.
+
+        Аргументы:
+            data (str): Строка с данными о месте хранения и ответственном лице.
+            context (Optional[str]): Дополнительная строка, в которой ищется только номер кабинета.
+
+        Возвращает:
+            EntityRecord: Номер кабинета и имя ответственного лица ('Null', если не найдены)
+                вместе с их границами в строке data + ' ' + context.
+        """
+
+        return RegexNamedEntityRecognizer._extract_record(data, context)
+
+    @staticmethod
+    async def extract_all_batch(data: List[str], contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        """
+        Пакетная версия extract_all.
+
+        Аргументы:
+            data (List[str]): Строки с данными о месте хранения и ответственном лице.
+            contexts (Optional[List[str]]): Дополнительные строки для поиска номера кабинета.
+
+        Возвращает:
+            List[EntityRecord]: Извлеченные сущности в том же порядке, что и строки.
+        """
+
+        if contexts is None:
+            contexts = [None] * len(data)
+        extract_record = RegexNamedEntityRecognizer._extract_record
+        return [extract_record(item, context) for item, context in zip(data, contexts)]
+
+    @staticmethod
+    def _extract_record(data: str, context: Optional[str]) -> EntityRecord:
+        """
+        Синхронная реализация extract_all.
+        """
+
+        cabinet_pattern = RegexNamedEntityRecognizer._CABINET_REGEX
+
+        location, location_span = 'Null', None
+        person, person_span = 'Null', None
+        cabinet_match = person_match = None
+        first_match = RegexNamedEntityRecognizer._FUSED_REGEX.search(data)
+        if first_match is not None:
+            start = first_match.start()
+            # Группы 1 и 2 — группы шаблона кабинета, группа 3 — ответственное лицо
+            if first_match.start(2) != -1:
+                location = first_match.group(2)
+                location_span = first_match.span(2)
+                person_match = RegexNamedEntityRecognizer._PERSON_REGEX.search(data, start)
+            else:
+                person = first_match.group(3).rstrip()
+                person_span = (start, start + len(person))
+                cabinet_match = cabinet_pattern.search(data, start)
+
+        # Если в data кабинета нет, ищем его в дополнительной строке. Найденный кабинет
+        # может начинаться в data, только если она заканчивается префиксом кабинета.
+        if location_span is None and cabinet_match is None and context is not None:
+            start = len(data)
+            if data.rstrip().endswith('.'):
+                tail_match = RegexNamedEntityRecognizer._CABINET_TAIL_REGEX.search(data)
+                if tail_match is not None:
+                    start = tail_match.start()
+            cabinet_match = cabinet_pattern.search(data + ' ' + context, start)
+
+        if cabinet_match is not None:
+            location = cabinet_match.group(2)
+            location_span = cabinet_match.span(2)
+        if person_match is not None:
+            person = person_match.group(0).rstrip()
+            start = person_match.start()
+            person_span = (start, start + len(person))
+
+        return EntityRecord(location, person, location_span, person_span)
+
+    @staticmethod
+    def confidence(data: str, record: EntityRecord, context: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Метод для оценки надежности результата extract_all.
+
+        Номер кабинета ненадежен, если в строке несколько разных номеров. Ответственное лицо
+        ненадежно, если это одно слово без инициалов (это может быть и название, например
+        "Интернет") или если инициалы стоят перед фамилией ("И.И.Иванов"), а такой формат
+        шаблон распознает только частично.
+
+        Аргументы:
+            data (str): Строка, переданная в extract_all.
+            record (EntityRecord): Результат extract_all.
+            context (Optional[str]): Дополнительная строка, переданная в extract_all.
+
+        Возвращает:
+            Tuple[float, float]: Уверенность от 0 до 1 в номере кабинета и в ответственном лице.
+        """
+
+        location_confidence = 0.0
+        if record.location != 'Null':
+            text = data if context is None else data + ' ' + context
+            numbers = {
+                match.group(2).strip().lower()
+                for match in RegexNamedEntityRecognizer._CABINET_REGEX.finditer(text)
+            }
+            location_confidence = 1.0 if len(numbers) <= 1 else RegexNamedEntityRecognizer.AMBIGUOUS_LOCATION_CONFIDENCE
+
+        person_confidence = 0.0
+        if record.responsible_person != 'Null':
+            if RegexNamedEntityRecognizer._INITIALS_FIRST_REGEX.search(data):
+                person_confidence = RegexNamedEntityRecognizer.INITIALS_FIRST_PERSON_CONFIDENCE
+            elif len(record.responsible_person.split()) == 1:
+                person_confidence = RegexNamedEntityRecognizer.SINGLE_WORD_PERSON_CONFIDENCE
+            else:
+                person_confidence = 1.0
+
+        return location_confidence, person_confidence
@@ -0,0 +1,134 @@
+from .NamedEntityRecognizer import NamedEntityRecognizer, EntityRecord
+from typing import Dict, List, Optional
+
+# Компоненты конвейера spaCy, которые не нужны для распознавания сущностей.
+# Для ru_core_news_* остаются только tok2vec и ner.
+EXCLUDED_COMPONENTS = ["morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer", "tagger"]
+
+# Загруженные модели, по одной на имя модели в каждом процессе
+_models: Dict[str, object] = {}
+
+
+def load_model(model_name: str):
+    """
+    Возвращает модель spaCy, загружая ее при первом обращении.
+
+    Модель загружается один раз на процесс и используется всеми экземплярами
+    SpacyNamedEntityRecognizer с тем же именем модели.
+
+    Args:
+        model_name (str): Имя модели spaCy, например "ru_core_news_lg".
+    """
+    nlp = _models.get(model_name)
+    if nlp is None:
+        import spacy
+        nlp = spacy.load(model_name, exclude=EXCLUDED_COMPONENTS)
+        _models[model_name] = nlp
+    return nlp
+
+
+class SpacyNamedEntityRecognizer(NamedEntityRecognizer):
+    """
+    Распознаватель сущностей на основе модели spaCy.
+
+    Тексты обрабатываются потоком через nlp.pipe, поэтому стоимость вызова модели
+    распределяется на весь пакет. Ответственное лицо — первая сущность PER,
+    место хранения — номер кабинета вида "к. 104", а если его нет, первая сущность LOC.
+    """
+
+    def __init__(self, model_name: str = "ru_core_news_lg", batch_size: int = 256, n_process: int = 1) -> None:
+        """
+        Args:
+            model_name (str): Имя модели spaCy.
+            batch_size (int): Размер пакета для nlp.pipe.
+            n_process (int): Количество процессов для nlp.pipe.
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+    def cache_identity(self) -> str:
+        return f"{self.VERSION};model={self.model_name}"
+
+    @property
+    def nlp(self):
+        """
+        Модель spaCy, загружается при первом использовании.
+        """
+        return load_model(self.model_name)
+
+    async def get_location(self, data: str) -> str:
+        return (await self.get_locations([data]))[0]
+
+    async def get_responsible_person(self, data: str) -> str:
+        return (await self.get_responsible_persons([data]))[0]
+
+    async def get_locations(self, data: List[str]) -> List[str]:
+        return [record.location for record in self._extract_records(data)]
+
+    async def get_responsible_persons(self, data: List[str]) -> List[str]:
+        return [record.responsible_person for record in self._extract_records(data)]
+
+    async def extract_all(self, data: str, context: Optional[str] = None) -> EntityRecord:
+        return (await self.extract_all_batch([data], None if context is None else [context]))[0]
+
+    async def extract_all_batch(self, data: List[str],
+                                contexts: Optional[List[str]] = None) -> List[EntityRecord]:
+        # Каждый текст обрабатывается моделью один раз вместе с дополнительной строкой,
+        # ответственное лицо ищется только в части, относящейся к data
+        if contexts is None:
+            return self._extract_records(data)
+        texts = [item + ' ' + context for item, context in zip(data, contexts)]
+        return self._extract_records(texts, [len(item) for item in data])
+
+    def _extract_records(self, texts: List[str], person_limits: Optional[List[int]] = None) -> List[EntityRecord]:
+        """
+        Извлекает сущности из текстов одним проходом nlp.pipe.
+
+        Args:
+            texts (List[str]): Тексты для обработки.
+            person_limits (Optional[List[int]]): Для каждого текста позиция, до которой
+                ищется ответственное лицо, по умолчанию весь текст.
+        """
+        if person_limits is None:
+            person_limits = [len(text) for text in texts]
+        docs = self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        return [self._extract_record(doc, limit) for doc, limit in zip(docs, person_limits)]
+
+    @staticmethod
+    def _extract_record(doc, person_limit: int) -> EntityRecord:
+        """
+        Составляет EntityRecord по обработанному документу.
+        """
+        location, location_span = 'Null', None
+        person, person_span = 'Null', None
+
+        custom_locations = SpacyNamedEntityRecognizer._extract_custom_locations(doc)
+        if custom_locations:
+            number_token = custom_locations[0]
+            location = number_token.text
+            location_span = (number_token.idx, number_token.idx + len(number_token.text))
+
+        for ent in doc.ents:
+            if ent.label_ == "LOC" and location_span is None:
+                location, location_span = ent.text, (ent.start_char, ent.end_char)
+            elif ent.label_ == "PER" and person_span is None and ent.end_char <= person_limit:
+                person, person_span = ent.text, (ent.start_char, ent.end_char)
+
+        return EntityRecord(location, person, location_span, person_span)
+
+    @staticmethod
+    def _extract_custom_locations(doc) -> list:
+        """
+        Дополнительная обработка для извлечения местоположений, таких как "к. 104".
+
+        Returns:
+            list: Токены с номерами кабинетов в порядке их появления в тексте.
+        """
+        custom_locations = []
+        for token in doc:
+            if token.text.lower().startswith("к.") and token.i + 1 < len(doc):
+                next_token = doc[token.i + 1]
+                if next_token.like_num:
+                    custom_locations.append(next_token)
+        return custom_locations
@@ -2,9 +2,10 @@ import asyncio
 from ollama import AsyncClient
 
 class DataExtractor:
-    def __init__(self, model: str = 'llama2'):
+    def __init__(self, model: str = 'llama2', host: str = None):
         self.model = model
-        self.client = AsyncClient()
+        # host позволяет подключиться к другому серверу, например к локальной заглушке
+        self.client = AsyncClient(host=host)
 
     # Функция для отправки сообщения модели и получения ответа
     async def get_model_response(self, prompt: str) -> str:
@@ -48,6 +48,41 @@ class NamedEntityRecognizer:
                         {"text": f"{token.text} {next_token.text}", "type": "CUSTOM_LOC"}
                     )
         return custom_locations
+
+
+def compare_throughput(ner: NamedEntityRecognizer, texts: List[str], batch_size: int = 256) -> Dict[str, float]:
+    """
+    Сравнивает скорость обработки текстов по одному (extract_entities) и пакетами через nlp.pipe.
+
+    Запуск из каталога app: python -m NamedEntityRecognitionModels.spacy_test
+
+    :return: Количество текстов в секунду для каждого способа.
+    """
+    import asyncio
+    import time
+    from . import SpacyNamedEntityRecognizer as spacy_backend
+
+    start = time.perf_counter()
+    for text in texts:
+        ner.extract_entities(text)
+    per_call = len(texts) / (time.perf_counter() - start)
+
+    # Используем уже загруженную модель, а не загружаем ее второй раз
+    spacy_backend._models.setdefault("compare", ner.nlp)
+    batched = spacy_backend.SpacyNamedEntityRecognizer("compare", batch_size=batch_size)
+    start = time.perf_counter()
+    asyncio.run(batched.extract_all_batch(texts))
+    pipe = len(texts) / (time.perf_counter() - start)
+
+    # Отдельно — nlp.pipe без лишних компонентов конвейера
+    with ner.nlp.select_pipes(enable=[name for name in ner.nlp.pipe_names if name in ("tok2vec", "ner")]):
+        start = time.perf_counter()
+        asyncio.run(batched.extract_all_batch(texts))
+        pruned = len(texts) / (time.perf_counter() - start)
+
+    return {"per_call": per_call, "pipe": pipe, "pipe_pruned": pruned}
+
+
 if __name__ == "__main__":
     ner = NamedEntityRecognizer()
     text = "Андрей Петров работает в кабинете к. 104. Иванова A.A. находится в к. 202."
@@ -56,9 +91,16 @@ if __name__ == "__main__":
     print("Извлеченные сущности:")
     for entity in extracted_entities:
         print(f"Текст: {entity['text']}, Тип: {entity['type']}")
-    nlp = spacy.load("ru_core_news_lg")
 
-    doc = nlp("Мария Иванова пошла в парк в Доме.")
+    doc = ner.nlp("Мария Иванова пошла в парк в Доме.")
     for ent in doc.ents:
         print(ent.text, ent.label_)
 
+    texts = [
+        "к.301 Кравченко А.В. расписка, Невского, ИЛ",
+        "к.128 Интернет",
+        "к.209 ИПМИ Кузьменко (399?)",
+        "к.123 Психдиспансер",
+    ] * 500
+    for method, speed in compare_throughput(ner, texts).items():
+        print(f"{method}: {speed:.0f} текстов/с")
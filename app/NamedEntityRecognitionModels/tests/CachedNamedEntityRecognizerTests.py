@@ -0,0 +1,133 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from ..CachedNamedEntityRecognizer import CachedNamedEntityRecognizer
+from ..LlmNamedEntityRecognizer import LlmNamedEntityRecognizer
+from ..RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
+from ..SpacyNamedEntityRecognizer import SpacyNamedEntityRecognizer
+
+
+class CountingRecognizer(RegexNamedEntityRecognizer):
+    """
+    Распознаватель на регулярных выражениях, который считает переданные ему тексты.
+    """
+    def __init__(self):
+        self.calls = 0
+
+    async def get_locations(self, data):
+        self.calls += len(data)
+        return await RegexNamedEntityRecognizer.get_locations(data)
+
+    async def get_responsible_persons(self, data):
+        self.calls += len(data)
+        return await RegexNamedEntityRecognizer.get_responsible_persons(data)
+
+    async def extract_all_batch(self, data, contexts=None):
+        self.calls += len(data)
+        return await RegexNamedEntityRecognizer.extract_all_batch(data, contexts)
+
+
+class ModelRecognizer(CountingRecognizer):
+    """
+    Распознаватель, результаты которого зависят от имени модели.
+    """
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def cache_identity(self):
+        return f"{self.VERSION};model={self.model}"
+
+
+class TestCachedNamedEntityRecognizer(unittest.TestCase):
+    def test_memory_cache(self):
+        backend = CountingRecognizer()
+        recognizer = CachedNamedEntityRecognizer(backend)
+
+        data = ["к.209 ИПМИ Кузьменко", "к.209  ИПМИ Кузьменко ", "к.301 Ленин А.В.", "к.209 ИПМИ Кузьменко"]
+        persons = asyncio.run(recognizer.get_responsible_persons(data))
+
+        # Тексты, отличающиеся только пробелами, распознаются один раз
+        self.assertEqual(persons, ["Кузьменко", "Кузьменко", "Ленин А.В.", "Кузьменко"])
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual(asyncio.run(recognizer.get_responsible_person("к.301 Ленин А.В.")), "Ленин А.В.")
+        self.assertEqual(backend.calls, 2)
+
+        info = recognizer.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (3, 2, 2))
+
+        # Разные методы кэшируются отдельно
+        self.assertEqual(asyncio.run(recognizer.get_location("к.209 ИПМИ Кузьменко")), "209")
+        self.assertEqual(backend.calls, 3)
+
+    def test_lru_eviction(self):
+        backend = CountingRecognizer()
+        recognizer = CachedNamedEntityRecognizer(backend, maxsize=2)
+
+        asyncio.run(recognizer.get_locations(["к.101", "к.102"]))
+        asyncio.run(recognizer.get_location("к.101"))
+        asyncio.run(recognizer.get_location("к.103"))  # Вытесняет к.102
+        self.assertEqual(backend.calls, 3)
+
+        asyncio.run(recognizer.get_location("к.101"))
+        self.assertEqual(backend.calls, 3)
+        asyncio.run(recognizer.get_location("к.102"))
+        self.assertEqual(backend.calls, 4)
+        self.assertEqual(recognizer.cache_info().currsize, 2)
+
+    def test_extract_all(self):
+        backend = CountingRecognizer()
+        recognizer = CachedNamedEntityRecognizer(backend, ignore_case=True)
+
+        records = asyncio.run(recognizer.extract_all_batch(
+            ["к.101 Сидоров", "К.101 Сидоров", "к.101 Сидоров"], ["Принтер", "Принтер", "Сканер"]
+        ))
+        self.assertEqual([record.location for record in records], ["101", "101", "101"])
+        self.assertEqual(records[0].responsible_person_span, (6, 13))
+        # Без учета регистра первые два текста совпадают, третий отличается дополнительной строкой
+        self.assertEqual(backend.calls, 2)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+
+            backend = CountingRecognizer()
+            recognizer = CachedNamedEntityRecognizer(backend, path=path)
+            asyncio.run(recognizer.extract_all("к.101 Сидоров", "Принтер"))
+            recognizer.close()
+
+            # Результаты сохраняются между запусками
+            backend = CountingRecognizer()
+            recognizer = CachedNamedEntityRecognizer(backend, path=path)
+            record = asyncio.run(recognizer.extract_all("к.101 Сидоров", "Принтер"))
+            self.assertEqual(record.location_span, (2, 5))
+            self.assertEqual(backend.calls, 0)
+            self.assertEqual(recognizer.cache_info().disk_hits, 1)
+            recognizer.close()
+
+            # Результаты другой версии распознавателя не используются
+            backend = CountingRecognizer()
+            recognizer = CachedNamedEntityRecognizer(backend, path=path, backend_version="2")
+            asyncio.run(recognizer.extract_all("к.101 Сидоров", "Принтер"))
+            self.assertEqual(backend.calls, 1)
+            recognizer.close()
+
+    def test_model_settings(self):
+        # Настройки модели входят в ключи кэша
+        self.assertNotEqual(SpacyNamedEntityRecognizer("ru_core_news_sm").cache_identity(),
+                            SpacyNamedEntityRecognizer("ru_core_news_lg").cache_identity())
+        self.assertNotEqual(LlmNamedEntityRecognizer("llama2").cache_identity(),
+                            LlmNamedEntityRecognizer("mistral").cache_identity())
+        small, large = (CachedNamedEntityRecognizer(SpacyNamedEntityRecognizer(model))
+                        for model in ("ru_core_news_sm", "ru_core_news_lg"))
+        self.assertNotEqual(small.cache_identity(), large.cache_identity())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            for model, calls in [("small", 1), ("large", 1), ("small", 0)]:
+                backend = ModelRecognizer(model)
+                recognizer = CachedNamedEntityRecognizer(backend, path=path)
+                asyncio.run(recognizer.extract_all("к.101 Сидоров", "Принтер"))
+                self.assertEqual(backend.calls, calls, model)
+                recognizer.close()
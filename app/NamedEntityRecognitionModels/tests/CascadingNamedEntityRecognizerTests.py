@@ -0,0 +1,59 @@
+import unittest
+import asyncio
+from ..CascadingNamedEntityRecognizer import CascadingNamedEntityRecognizer
+from ..NamedEntityRecognizer import NamedEntityRecognizer
+from ..RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
+
+
+class DictionaryRecognizer(NamedEntityRecognizer):
+    """
+    Распознаватель, который знает ответы для заданных текстов и запоминает, какие тексты ему передали.
+    """
+    def __init__(self, answers):
+        self.answers = answers
+        self.texts = []
+
+    async def get_location(self, data):
+        return self.answers.get(data, ('Null', 'Null'))[0]
+
+    async def get_responsible_person(self, data):
+        self.texts.append(data)
+        return self.answers.get(data, ('Null', 'Null'))[1]
+
+
+class TestCascadingNamedEntityRecognizer(unittest.TestCase):
+    def test_regex_confidence(self):
+        recognizer = RegexNamedEntityRecognizer()
+        for data, expected in [
+            ("к.301 Ленин А.В. расписка", (1.0, 1.0)),
+            ("к.101 Сидоров", (1.0, 0.6)),
+            ("И.И.Иванов надо доработать!!", (0.0, 0.2)),
+            ("к.101 к.102", (0.4, 0.0)),
+        ]:
+            record = asyncio.run(recognizer.extract_all(data))
+            self.assertEqual(recognizer.confidence(data, record), expected)
+
+    def test_cascade(self):
+        second = DictionaryRecognizer({"И.И.Иванов к.204": ('204', 'И.И.Иванов')})
+        third = DictionaryRecognizer({})
+        cascade = CascadingNamedEntityRecognizer([RegexNamedEntityRecognizer(), second, third], thresholds=[0.5, 0.5])
+        data = ["к.301 Ленин А.В. расписка", "И.И.Иванов к.204", "к.101 Сидоров", "без данных"]
+        records = asyncio.run(cascade.extract_all_batch(data))
+
+        self.assertEqual([record[:2] for record in records], [
+            ('301', 'Ленин А.В.'), ('204', 'И.И.Иванов'), ('101', 'Сидоров'), ('Null', 'Null'),
+        ])
+        # Дальше первого уровня передаются только ненадежные результаты
+        self.assertEqual(second.texts, ["И.И.Иванов к.204", "без данных"])
+        self.assertEqual(third.texts, ["без данных"])
+        info = cascade.cascade_info()
+        self.assertEqual([(tier.rows, tier.resolved) for tier in info.tiers], [(4, 2), (2, 1), (1, 0)])
+        self.assertEqual(info.unresolved, 1)
+
+    def test_threshold_escalates_single_word(self):
+        second = DictionaryRecognizer({"к.101 Сидоров": ('101', 'Сидоров П.П.')})
+        cascade = CascadingNamedEntityRecognizer([RegexNamedEntityRecognizer(), second], thresholds=0.7)
+        record = asyncio.run(cascade.extract_all("к.101 Сидоров"))
+        self.assertEqual(record[:2], ('101', 'Сидоров П.П.'))
+        # Место хранения осталось от первого уровня вместе с его границами
+        self.assertEqual(record.location_span, (2, 5))
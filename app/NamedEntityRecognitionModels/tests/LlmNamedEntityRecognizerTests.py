@@ -0,0 +1,111 @@
+import unittest
+import asyncio
+import importlib.util
+from ..LlmNamedEntityRecognizer import LlmNamedEntityRecognizer, SYSTEM_PROMPT, BATCH_SYSTEM_PROMPT
+from ..RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
+from benchmarks.FakeOllamaServer import FakeOllamaServer, regex_responder
+
+DATA = [f"к.{100 + i} Иванов И.И." if i % 3 else f"склад {i}" for i in range(45)]
+
+
+class FakeClient:
+    """
+    Клиент с интерфейсом ollama.AsyncClient, который отвечает через regex_responder.
+    """
+    def __init__(self, failures=0, broken_rows=False):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.failures = failures
+        self.broken_rows = broken_rows
+        self.system_prompts = []
+
+    async def chat(self, model, messages, options=None, format=None):
+        self.calls += 1
+        self.system_prompts.append((format, messages[0]["content"]))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.001)
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("сервер недоступен")
+            content = regex_responder(messages)
+            if format == "json" and self.broken_rows:
+                # Ответ без первой строки пакета
+                content = content.replace('"id": 0', '"id": -1')
+            return {"message": {"role": "assistant", "content": content}}
+        finally:
+            self.active -= 1
+
+
+class TestLlmNamedEntityRecognizer(unittest.TestCase):
+    def expected(self, data):
+        return [record[:2] for record in asyncio.run(RegexNamedEntityRecognizer.extract_all_batch(data))]
+
+    def test_batched_prompts(self):
+        client = FakeClient()
+        recognizer = LlmNamedEntityRecognizer(client=client, rows_per_prompt=20, max_concurrency=2)
+        records = asyncio.run(recognizer.extract_all_batch(DATA))
+        self.assertEqual([record[:2] for record in records], self.expected(DATA))
+        # Один запрос на 20 строк вместо двух запросов на строку
+        self.assertEqual(client.calls, 3)
+        self.assertLessEqual(client.max_active, 2)
+
+    def test_fallback_and_retries(self):
+        client = FakeClient(failures=2, broken_rows=True)
+        recognizer = LlmNamedEntityRecognizer(client=client, rows_per_prompt=20, backoff=0.001)
+        records = asyncio.run(recognizer.extract_all_batch(DATA))
+        self.assertEqual([record[:2] for record in records], self.expected(DATA))
+        # 2 неудачные попытки, 3 пакета и по 2 запроса для первой строки каждого пакета
+        self.assertEqual(client.calls, 2 + 3 + 3 * 2)
+        # Пакетные запросы идут со своим системным сообщением, запросы одной сущности — с SYSTEM_PROMPT
+        self.assertCountEqual(client.system_prompts,
+                              [("json", BATCH_SYSTEM_PROMPT)] * (2 + 3) + [(None, SYSTEM_PROMPT)] * 3 * 2)
+
+        client = FakeClient(failures=2)
+        recognizer = LlmNamedEntityRecognizer(client=client, retries=1, backoff=0.001)
+        with self.assertRaises(ConnectionError):
+            asyncio.run(recognizer.extract_all("к.101 Иванов И.И."))
+
+    def test_non_string_answers(self):
+        # Номер кабинета числом сохраняется, ответ другого типа уходит в запрос по одной строке
+        answer = ('{"rows": [{"id": 0, "location": 301, "responsible_person": "Иванов И.И."},'
+                  ' {"id": 1, "location": ["128"], "responsible_person": null},'
+                  ' {"id": 2, "location": 12.5, "responsible_person": true}]}')
+        records = LlmNamedEntityRecognizer._parse_batch_answer(answer, 3)
+        self.assertEqual(sorted(records), [0])
+        self.assertEqual(records[0][:2], ("301", "Иванов И.И."))
+
+        class NumberClient(FakeClient):
+            async def chat(self, model, messages, options=None, format=None):
+                response = await super().chat(model, messages, options, format)
+                if format == "json":
+                    response["message"]["content"] = response["message"]["content"].replace(
+                        '"location": "101"', '"location": 101').replace(
+                        '"location": "102"', '"location": {"value": "102"}')
+                return response
+
+        client = NumberClient()
+        data = ["к.101 Иванов И.И.", "к.102 Петров П.П."]
+        records = asyncio.run(LlmNamedEntityRecognizer(client=client).extract_all_batch(data))
+        self.assertEqual([record[:2] for record in records], self.expected(data))
+        # Пакет и 2 запроса для строки с ответом-объектом
+        self.assertEqual(client.calls, 3)
+
+    def test_timeout(self):
+        class SlowClient:
+            async def chat(self, **options):
+                await asyncio.sleep(1)
+
+        recognizer = LlmNamedEntityRecognizer(client=SlowClient(), timeout=0.01, retries=0)
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(recognizer.extract_all("к.101 Иванов И.И."))
+
+    @unittest.skipUnless(importlib.util.find_spec("ollama"), "пакет ollama не установлен")
+    def test_fake_server(self):
+        with FakeOllamaServer(responder=regex_responder) as server:
+            recognizer = LlmNamedEntityRecognizer(host=server.url, rows_per_prompt=20)
+            records = asyncio.run(recognizer.extract_all_batch(DATA))
+            self.assertEqual([record[:2] for record in records], self.expected(DATA))
+            self.assertEqual(server.requests, 3)
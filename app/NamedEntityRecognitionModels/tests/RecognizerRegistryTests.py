@@ -0,0 +1,33 @@
+import unittest
+import os
+import subprocess
+import sys
+from ..RecognizerRegistry import create_recognizer, get_recognizer_class
+from ..CachedNamedEntityRecognizer import CachedNamedEntityRecognizer
+from ..RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
+
+
+class TestRecognizerRegistry(unittest.TestCase):
+    def test_create_recognizer(self):
+        self.assertIsInstance(create_recognizer("regex"), RegexNamedEntityRecognizer)
+        cached = create_recognizer("cached", maxsize=10)
+        self.assertIsInstance(cached, CachedNamedEntityRecognizer)
+        self.assertIsInstance(cached.backend, RegexNamedEntityRecognizer)
+        self.assertIsInstance(create_recognizer("cached:regex").backend, RegexNamedEntityRecognizer)
+        with self.assertRaises(ValueError):
+            get_recognizer_class("unknown")
+        with self.assertRaises(ValueError):
+            create_recognizer("regex:spacy")
+
+    def test_lazy_imports(self):
+        # Импорт преобразователя и выбор распознавателя не загружают тяжелые зависимости
+        code = (
+            "import sys, ExcelTableTransformer\n"
+            "ExcelTableTransformer.ExcelTableTransformer(None, ner='llm')\n"
+            "print(sorted({'pandas', 'openpyxl', 'spacy', 'ollama'} & set(sys.modules)))"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR,
+                                   capture_output=True, text=True, check=True)
+        self.assertEqual(completed.stdout.strip(), "[]")
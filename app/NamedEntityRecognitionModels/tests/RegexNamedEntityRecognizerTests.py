@@ -1,5 +1,6 @@
 import unittest
 import asyncio
+from ..NamedEntityRecognizer import NamedEntityRecognizer
 from ..RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
 
 class TestRegexNamedEntityRecognizer(unittest.TestCase):
@@ -59,3 +60,65 @@ class TestRegexNamedEntityRecognizer(unittest.TestCase):
         self.assertEqual(result3, "Null")  # Ответственное лицо не указано, ожидаем "Null"
         self.assertEqual(result4, "Иванов И. И.")  # Ожидаем ответственного "Иванов И. И."
         self.assertEqual(result5, "Иванов")  # Ожидаем ответственного "Иванов"
+
+    def test_batch_methods(self):
+        recognizer = RegexNamedEntityRecognizer()
+
+        data = [
+            "к.301a Кравченко А.В. расписка",
+            "каб.128 интернет",
+            "Нет номера кабинета",
+            "Иванов И. И.",
+            "",
+        ]
+
+        # Пакетные методы должны совпадать с построчными
+        locations = asyncio.run(recognizer.get_locations(data))
+        persons = asyncio.run(recognizer.get_responsible_persons(data))
+
+        self.assertEqual(locations, [asyncio.run(recognizer.get_location(item)) for item in data])
+        self.assertEqual(persons, [asyncio.run(recognizer.get_responsible_person(item)) for item in data])
+        self.assertEqual(asyncio.run(recognizer.get_locations([])), [])
+
+    def test_default_batch_methods(self):
+        # Пакетные методы интерфейса по умолчанию вызывают построчные
+        class UpperRecognizer(NamedEntityRecognizer):
+            async def get_location(self, data):
+                return data.upper()
+
+            async def get_responsible_person(self, data):
+                return 'Null'
+
+        recognizer = UpperRecognizer()
+        self.assertEqual(asyncio.run(recognizer.get_locations(["к.101", "к.102"])), ["К.101", "К.102"])
+        self.assertEqual(asyncio.run(recognizer.get_responsible_persons(["к.101"])), ["Null"])
+
+    def test_extract_all(self):
+        recognizer = RegexNamedEntityRecognizer()
+
+        data = [
+            ("к.301a Кравченко А.В. расписка", "Принтер"),
+            ("Кравченко А.В. к.128", "Принтер"),
+            ("Иванов И. И.", "Принтер Canon (к.212)"),
+            ("на списание к.", "301 Принтер"),
+            ("Нет номера кабинета", None),
+            ("", ""),
+        ]
+
+        # Результат должен совпадать с раздельными вызовами get_location и get_responsible_person
+        for text, context in data:
+            record = asyncio.run(recognizer.extract_all(text, context))
+            location_text = text if context is None else text + ' ' + context
+            self.assertEqual(record.location, asyncio.run(recognizer.get_location(location_text)))
+            self.assertEqual(record.responsible_person, asyncio.run(recognizer.get_responsible_person(text)))
+
+            # Границы сущностей указывают на найденный текст
+            if record.location_span is not None:
+                self.assertEqual(location_text[slice(*record.location_span)], record.location)
+            if record.responsible_person_span is not None:
+                self.assertEqual(text[slice(*record.responsible_person_span)], record.responsible_person)
+
+        records = asyncio.run(recognizer.extract_all_batch([text for text, _ in data[:4]], [context for _, context in data[:4]]))
+        self.assertEqual([record.location for record in records], ["301a", "128", "212", "301"])
+        self.assertEqual(records[0].location_span, (2, 6))
+        self.assertEqual(records[1].responsible_person_span, (0, 14))
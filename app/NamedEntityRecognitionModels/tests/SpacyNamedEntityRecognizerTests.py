@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+import importlib.util
+import re
+from ..SpacyNamedEntityRecognizer import SpacyNamedEntityRecognizer, _models, load_model
+
+
+class FakeToken:
+    def __init__(self, doc, i, match):
+        self.doc = doc
+        self.i = i
+        self.text = match.group()
+        self.idx = match.start()
+        self.like_num = self.text.isdigit()
+
+
+class FakeSpan:
+    def __init__(self, text, label, start_char):
+        self.text = text
+        self.label_ = label
+        self.start_char = start_char
+        self.end_char = start_char + len(text)
+
+
+class FakeDoc:
+    """
+    Документ с интерфейсом spacy.tokens.Doc: токены по пробелам, сущности PER — фамилии
+    с инициалами, LOC — слова из LOCATIONS.
+    """
+    LOCATIONS = ("Москва", "склад")
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = [FakeToken(self, i, match) for i, match in enumerate(re.finditer(r'\S+', text))]
+        self.ents = [FakeSpan(match.group(), "PER", match.start())
+                     for match in re.finditer(r'[А-ЯЁ][а-яё]+ [А-ЯЁ]\.[А-ЯЁ]\.', text)]
+        self.ents += [FakeSpan(word, "LOC", text.index(word)) for word in self.LOCATIONS if word in text]
+        self.ents.sort(key=lambda ent: ent.start_char)
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, i):
+        return self.tokens[i]
+
+
+class FakeModel:
+    """
+    Модель с методом pipe, как у spacy.Language; запоминает обработанные тексты.
+    """
+    def __init__(self):
+        self.texts = []
+
+    def pipe(self, texts, batch_size=256, n_process=1):
+        for text in texts:
+            self.texts.append(text)
+            yield FakeDoc(text)
+
+
+class TestSpacyNamedEntityRecognizer(unittest.TestCase):
+    def setUp(self):
+        self.model = FakeModel()
+        _models["fake"] = self.model
+
+    def tearDown(self):
+        _models.pop("fake", None)
+        _models.pop("blank", None)
+
+    def test_extract_record(self):
+        # Номер кабинета "к. 104" важнее сущности LOC, которая идет раньше
+        record = SpacyNamedEntityRecognizer._extract_record(FakeDoc("склад к. 104 Иванов И.И."), 100)
+        self.assertEqual(record.location, "104")
+        self.assertEqual(record.location_span, (9, 12))
+        self.assertEqual(record.responsible_person, "Иванов И.И.")
+        # Без номера кабинета берется первая сущность LOC
+        record = SpacyNamedEntityRecognizer._extract_record(FakeDoc("Москва склад"), 100)
+        self.assertEqual((record.location, record.location_span), ("Москва", (0, 6)))
+        self.assertEqual(record.responsible_person, 'Null')
+        # "к." без числа после него не является номером кабинета
+        record = SpacyNamedEntityRecognizer._extract_record(FakeDoc("к. склад"), 100)
+        self.assertEqual(record.location, "склад")
+
+    def test_person_limit(self):
+        # Ответственное лицо ищется только до person_limit
+        doc = FakeDoc("к. 104 Иванов И.И.")
+        self.assertEqual(SpacyNamedEntityRecognizer._extract_record(doc, 6).responsible_person, 'Null')
+        self.assertEqual(SpacyNamedEntityRecognizer._extract_record(doc, 18).responsible_person, "Иванов И.И.")
+
+        recognizer = SpacyNamedEntityRecognizer("fake")
+        records = asyncio.run(recognizer.extract_all_batch(["к. 104", "к. 105 Петров П.П."],
+                                                           ["Принтер Сидоров С.С.", "склад"]))
+        # Номер кабинета ищется и в наименовании, ответственное лицо — только в тексте
+        self.assertEqual([record[:2] for record in records], [("104", 'Null'), ("105", "Петров П.П.")])
+        # Каждый текст передан модели один раз вместе с наименованием
+        self.assertEqual(self.model.texts, ["к. 104 Принтер Сидоров С.С.", "к. 105 Петров П.П. склад"])
+
+    def test_shared_model(self):
+        # Модель загружается один раз и используется всеми распознавателями с тем же именем
+        first = SpacyNamedEntityRecognizer("fake")
+        second = SpacyNamedEntityRecognizer("fake", batch_size=2)
+        self.assertIs(first.nlp, self.model)
+        self.assertIs(second.nlp, self.model)
+        self.assertIs(load_model("fake"), self.model)
+
+    @unittest.skipUnless(importlib.util.find_spec("spacy"), "пакет spacy не установлен")
+    def test_blank_model(self):
+        import spacy
+        _models["blank"] = spacy.blank("ru")
+        recognizer = SpacyNamedEntityRecognizer("blank")
+        records = asyncio.run(recognizer.extract_all_batch(["к. 104 Иванов И.И.", "склад"]))
+        self.assertEqual([record.location for record in records], ["104", 'Null'])
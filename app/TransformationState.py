@@ -0,0 +1,137 @@
+import datetime
+import json
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+
+class IncrementalReport(NamedTuple):
+    """
+    Итоги инкрементального преобразования.
+
+    Attributes:
+        added (int): Сколько строк появилось с прошлого запуска.
+        changed (int): Сколько строк изменилось с прошлого запуска.
+        unchanged (int): Сколько строк скопировано из прошлого результата без распознавания.
+        deleted (List[str]): Ключи строк, которые были в прошлом запуске, но отсутствуют сейчас.
+        resumed (bool): Был ли продолжен прерванный запуск.
+    """
+    added: int
+    changed: int
+    unchanged: int
+    deleted: List[str]
+    resumed: bool
+
+
+class TransformationState:
+    """
+    Состояние инкрементального преобразования, хранится в файле SQLite рядом с результатом.
+
+    Для каждой строки исходной таблицы хранится ее отпечаток (хеш содержимого) и
+    преобразованная строка. Запуск фиксирует результаты частями: если он прервался,
+    следующий запуск продолжает работу и не распознает повторно уже сохраненные строки.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Путь к файлу состояния.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY, started_at TEXT NOT NULL, finished_at TEXT);"
+            "CREATE TABLE IF NOT EXISTS rows ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, row TEXT NOT NULL, "
+            "run_id INTEGER NOT NULL, status TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS rows_run_id ON rows (run_id);"
+        )
+        self.run_id = None
+        self.resumed = False
+
+    def begin_run(self) -> int:
+        """
+        Продолжает прерванный запуск или начинает новый.
+
+        Returns:
+            int: Идентификатор запуска.
+        """
+        row = self.connection.execute(
+            "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        self.resumed = row is not None
+        if self.resumed:
+            self.run_id = row[0]
+        else:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO runs (started_at) VALUES (?)", (self.__now(),)
+                )
+            self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def load(self, keys: List[str]) -> Dict[str, Tuple[str, list, int, str]]:
+        """
+        Загружает сохраненные строки.
+
+        Returns:
+            Словарь ключ -> (отпечаток, преобразованная строка, идентификатор запуска, статус).
+        """
+        found = {}
+        # SQLite ограничивает количество параметров в одном запросе
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            rows = self.connection.execute(
+                "SELECT key, fingerprint, row, run_id, status FROM rows "
+                "WHERE key IN (" + ", ".join("?" * len(part)) + ")",
+                part,
+            )
+            for key, fingerprint, row, run_id, status in rows:
+                found[key] = (fingerprint, json.loads(row), run_id, status)
+        return found
+
+    def commit(self, rows: Iterable[Tuple[str, str, list, str]]) -> None:
+        """
+        Сохраняет обработанную часть таблицы одной транзакцией (контрольная точка).
+
+        Args:
+            rows: Кортежи (ключ, отпечаток, преобразованная строка, статус).
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO rows (key, fingerprint, row, run_id, status) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, fingerprint, json.dumps(row, ensure_ascii=False), self.run_id, status)
+                    for key, fingerprint, row, status in rows
+                ],
+            )
+
+    def finish_run(self) -> IncrementalReport:
+        """
+        Завершает запуск: удаляет строки, которых больше нет в исходной таблице,
+        и возвращает итоги.
+        """
+        counts = dict(self.connection.execute(
+            "SELECT status, COUNT(*) FROM rows WHERE run_id = ? GROUP BY status", (self.run_id,)
+        ))
+        deleted = [
+            key for key, in self.connection.execute(
+                "SELECT key FROM rows WHERE run_id != ? ORDER BY key", (self.run_id,)
+            )
+        ]
+        with self.connection:
+            self.connection.execute("DELETE FROM rows WHERE run_id != ?", (self.run_id,))
+            self.connection.execute(
+                "UPDATE runs SET finished_at = ? WHERE id = ?", (self.__now(), self.run_id)
+            )
+        return IncrementalReport(
+            counts.get("added", 0), counts.get("changed", 0), counts.get("unchanged", 0),
+            deleted, self.resumed,
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def __now() -> str:
+        return datetime.datetime.now().isoformat(timespec="seconds")
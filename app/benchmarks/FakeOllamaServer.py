@@ -0,0 +1,113 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+
+class FakeOllamaServer:
+    """
+    Локальная заглушка сервера Ollama для замеров и тестов LLM-распознавателей.
+
+    Отвечает на POST /api/chat в формате Ollama (без потоковой передачи). Текст ответа
+    вычисляет функция responder по списку сообщений запроса, задержка latency имитирует
+    время работы модели.
+    """
+
+    def __init__(self, responder: Optional[Callable[[list], str]] = None, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Args:
+            responder: Функция, получающая сообщения запроса и возвращающая текст ответа,
+                по умолчанию всегда 'Null'.
+            latency (float): Задержка ответа в секундах.
+            host (str): Адрес сервера.
+            port (int): Порт, 0 — выбрать свободный.
+        """
+        self.responder = responder or (lambda messages: 'Null')
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path != "/api/chat":
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                content = server.responder(body.get("messages", []))
+                payload = json.dumps({
+                    "model": body.get("model", ""),
+                    "created_at": "1970-01-01T00:00:00Z",
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                }, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def regex_responder(messages: list) -> str:
+    """
+    Отвечает на запросы LlmNamedEntityRecognizer так, как ответила бы модель,
+    используя RegexNamedEntityRecognizer: на запрос нескольких строк — JSON-объектом,
+    на запрос одной сущности — найденным значением.
+    """
+    from NamedEntityRecognitionModels.RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
+    prompt = messages[-1]["content"]
+    rows_start = prompt.find("Строки:")
+    if rows_start != -1:
+        rows = json.loads(prompt[rows_start + len("Строки:"):])
+        answer = []
+        for row in rows:
+            record = RegexNamedEntityRecognizer._extract_record(row["text"], row.get("name"))
+            answer.append({"id": row["id"], "location": record.location,
+                           "responsible_person": record.responsible_person})
+        return json.dumps({"rows": answer}, ensure_ascii=False)
+    match = re.search(r'Текст: "(.*)"\nЗапрос: "(.*)"', prompt, re.DOTALL)
+    if match is None:
+        return 'Null'
+    text, query = match.groups()
+    if query == "кабинет":
+        cabinet = RegexNamedEntityRecognizer._CABINET_REGEX.search(text)
+        return cabinet.group(2).strip() if cabinet else 'Null'
+    person = RegexNamedEntityRecognizer._PERSON_REGEX.search(text)
+    return person.group(0).strip() if person else 'Null'
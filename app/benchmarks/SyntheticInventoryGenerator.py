@@ -0,0 +1,137 @@
+import os
+import random
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ExcelTableTransformer import OLD_TABLE_STRUCTURE
+
+SURNAMES = [
+    "Иванов", "Петров", "Сидоров", "Кравченко", "Кузьменко", "Смирнова", "Попов", "Волкова",
+    "Соколов", "Лебедев", "Козлова", "Новиков", "Морозов", "Павлова", "Федоров", "Орлов",
+]
+INITIALS = "АБВГДЕИКЛМНОПРСТ"
+ORGANIZATIONS = ["ИПМИ", "ИЛ", "Технический отдел", "Бухгалтерия", "Психдиспансер", "Интернет"]
+NOTES = ["расписка", "на списание", "для лекций", "(399?)", "Невского", "в ремонте", "склад"]
+ITEMS = [
+    "Принтер Canon LBP2900", "Принтер Brother HL-L2350D", "Телевизор LG 32LK",
+    "Проектор Epson EB-S04", "Компьютер Lenovo ThinkCentre", "Монитор Samsung S24",
+    "Сканер HP ScanJet", "Лифт ГМ-460", "Ноутбук ASUS X515", "Кресло офисное",
+]
+
+
+class SyntheticInventoryGenerator:
+    """
+    Генератор таблиц старого образца (OLD_TABLE_STRUCTURE) для замеров производительности.
+
+    Описания "Местонахождение" берутся из ограниченного набора уникальных строк с
+    распределением Ципфа, поэтому часто встречающиеся строки повторяются тысячи раз,
+    как в реальных данных. Строки сочетают разные форматы кабинетов ("к.301", "каб.128",
+    "Каб. 405", "к.301а", "к.402-А") и имен ("Иванов И.И.", "Иванов И. И.", "И.И.Иванов",
+    "Иванов"), часть описаний пустая.
+    """
+
+    def __init__(self, seed: int = 0, unique_ratio: float = 0.05, empty_ratio: float = 0.3) -> None:
+        """
+        Args:
+            seed (int): Начальное значение генератора случайных чисел.
+            unique_ratio (float): Доля уникальных описаний от числа строк.
+            empty_ratio (float): Доля строк без описания.
+        """
+        self.seed = seed
+        self.unique_ratio = unique_ratio
+        self.empty_ratio = empty_ratio
+
+    def cabinet(self, rng: random.Random) -> str:
+        number = str(rng.randint(100, 499))
+        form = rng.random()
+        if form < 0.5:
+            return "к." + number
+        if form < 0.65:
+            return "каб." + number
+        if form < 0.75:
+            return "Каб. " + number
+        if form < 0.85:
+            return "к." + number + rng.choice("абвАБ")
+        if form < 0.95:
+            return "к." + number + "-" + rng.choice("АБВ")
+        # Номер без префикса, распознаватель на регулярных выражениях его не находит
+        return number
+
+    def person(self, rng: random.Random) -> str:
+        surname = rng.choice(SURNAMES)
+        first, second = rng.choice(INITIALS), rng.choice(INITIALS)
+        form = rng.random()
+        if form < 0.45:
+            return f"{surname} {first}.{second}."
+        if form < 0.65:
+            return f"{surname} {first}. {second}."
+        if form < 0.8:
+            return f"{first}.{second}.{surname}"
+        return surname
+
+    def location_text(self, rng: random.Random) -> str:
+        parts = []
+        if rng.random() < 0.85:
+            parts.append(self.cabinet(rng))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(ORGANIZATIONS))
+        if rng.random() < 0.7:
+            parts.append(self.person(rng))
+        if rng.random() < 0.4:
+            parts.append(rng.choice(NOTES))
+        return " ".join(parts) if parts else rng.choice(NOTES)
+
+    def location_texts(self, rows: int) -> List[Optional[str]]:
+        """
+        Возвращает значения столбца "Местонахождение" (None — пустая ячейка).
+        """
+        rng = random.Random(self.seed)
+        unique = [self.location_text(rng) for _ in range(max(1, int(rows * self.unique_ratio)))]
+        # Веса по закону Ципфа: строка с рангом k встречается в ~1/k раз реже самой частой
+        weights = [1 / rank for rank in range(1, len(unique) + 1)]
+        texts = rng.choices(unique, weights=weights, k=rows)
+        return [None if rng.random() < self.empty_ratio else text for text in texts]
+
+    def rows(self, rows: int):
+        """
+        Генерирует строки таблицы в порядке OLD_TABLE_STRUCTURE.
+        """
+        rng = random.Random(self.seed + 1)
+        for i, location in enumerate(self.location_texts(rows)):
+            item = rng.choice(ITEMS)
+            if rng.random() < 0.3:
+                item += f" ({self.cabinet(rng)})"
+            storage = rng.choice(ORGANIZATIONS)
+            mol = f"{rng.choice(SURNAMES)} {rng.choice(INITIALS)}. {rng.choice(INITIALS)}."
+            yield [
+                item,
+                f"{rng.randint(1, 999):03d}.{i:06d}",
+                f"{mol} - {storage}",
+                location,
+                f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1980, 2024)}",
+                rng.choice(["Да", "Нет"]),
+                f"{i:018d}",
+                "Введено в эксплуатацию",
+                101.34,
+                4,
+                "01100000000000000",
+                "Иное движимое имущество",
+                "<не задано>",
+                f"ва{i:010d}",
+                item,
+            ]
+
+    def write(self, path: str, rows: int) -> str:
+        """
+        Записывает таблицу в файл .xlsx, не держа ее в памяти целиком.
+        """
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        sheet = wb.create_sheet()
+        sheet.append(OLD_TABLE_STRUCTURE)
+        for row in self.rows(rows):
+            sheet.append(row)
+        wb.save(path)
+        return path
@@ -0,0 +1,248 @@
+"""
+Замеры производительности преобразования таблиц и распознавателей сущностей.
+
+Запуск из каталога app:
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --output bench.json
+    python benchmarks/run_benchmarks.py --rows 10000 --compare bench.json
+
+Для каждого размера генерируется таблица старого образца (файлы кэшируются в --data-dir),
+каждый замер выполняется в отдельном процессе, чтобы пиковое потребление памяти
+относилось только к нему. Результаты сохраняются в JSON для сравнения между коммитами.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.SyntheticInventoryGenerator import SyntheticInventoryGenerator
+
+# Режимы ExcelTableTransformer.transform
+TRANSFORMER_CASES = {
+    "transformer": dict(),
+    "transformer_streaming": dict(streaming=True),
+    "transformer_vectorized": dict(vectorized=True),
+    "transformer_vectorized_streaming": dict(vectorized=True, streaming=True),
+    "transformer_workers": dict(workers=os.cpu_count() or 1),
+}
+
+# Распознаватели; для LLM количество строк ограничено, так как каждый вызов — запрос к серверу
+RECOGNIZER_CASES = ["regex", "cached", "spacy", "llm"]
+LLM_MAX_ROWS = 2000
+
+# Сколько строк преобразуется по одной для замера задержки строки в замерах transform
+LATENCY_SAMPLE_ROWS = 1000
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def peak_memory_mb() -> float:
+    # ru_maxrss в Linux измеряется в килобайтах, в macOS — в байтах
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def result(name: str, rows: int, elapsed: float, latencies: List[float]) -> Dict[str, object]:
+    return {
+        "name": name,
+        "rows": rows,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 4) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4) if latencies else None,
+        "peak_memory_mb": round(peak_memory_mb(), 1),
+    }
+
+
+def run_transformer_case(name: str, sheet: str, rows: int, output_dir: str) -> Dict[str, object]:
+    """
+    Замер transform. Задержка строки замеряется после основного прогона: первые
+    LATENCY_SAMPLE_ROWS строк таблицы преобразуются по одной при batch_size=1
+    (для vectorized и workers строки не проходят через _transform_chunk, задержка не замеряется).
+    """
+    from ExcelTableTransformer import ExcelTableTransformer
+
+    transformer = ExcelTableTransformer(sheet)
+    sample = []
+    transform_chunk = transformer._transform_chunk
+
+    async def sampling_transform_chunk(notes):
+        if len(sample) < LATENCY_SAMPLE_ROWS:
+            sample.extend(notes[:LATENCY_SAMPLE_ROWS - len(sample)])
+        return await transform_chunk(notes)
+
+    transformer._transform_chunk = sampling_transform_chunk
+    output = os.path.join(output_dir, f"{name}_{rows}.xlsx")
+    start = time.perf_counter()
+    asyncio.run(transformer.transform(output, **TRANSFORMER_CASES[name]))
+    elapsed = time.perf_counter() - start
+    os.remove(output)
+
+    row_transformer = ExcelTableTransformer(None, ner=transformer.NER, batch_size=1)
+
+    async def measure():
+        latencies = []
+        for note in sample:
+            row_start = time.perf_counter()
+            await row_transformer._transform_chunk([note])
+            latencies.append(time.perf_counter() - row_start)
+        return latencies
+
+    return result(name, rows, elapsed, asyncio.run(measure()))
+
+
+def make_recognizer(name: str, server_url: str = None):
+    from NamedEntityRecognitionModels.RecognizerRegistry import create_recognizer
+    if name == "llm":
+        return create_recognizer(name, host=server_url)
+    return create_recognizer(name)
+
+
+def run_recognizer_case(name: str, rows: int) -> Dict[str, object]:
+    """
+    Замер распознавателя: задержка — время вызова для одной строки,
+    пропускная способность — время пакетной обработки всех строк.
+    """
+    texts = [text or 'nan' for text in SyntheticInventoryGenerator().location_texts(rows)]
+
+    if name == "llm":
+        from benchmarks.FakeOllamaServer import FakeOllamaServer, regex_responder
+        texts = texts[:LLM_MAX_ROWS]
+        with FakeOllamaServer(responder=regex_responder, latency=0.001) as server:
+            extractor = make_recognizer(name, server.url)
+
+            async def run():
+                latencies = []
+                # Задержка одной строки замеряется на первой сотне строк
+                for text in texts[:100]:
+                    row_start = time.perf_counter()
+                    await extractor.extract_all(text)
+                    latencies.append(time.perf_counter() - row_start)
+                requests_before = server.requests
+                start = time.perf_counter()
+                for i in range(0, len(texts), 256):
+                    await extractor.extract_all_batch(texts[i:i + 256])
+                return time.perf_counter() - start, latencies, server.requests - requests_before
+
+            elapsed, latencies, requests = asyncio.run(run())
+        item = result(name, len(texts), elapsed, latencies)
+        item["model_calls_per_1k_rows"] = round(requests * 1000 / len(texts), 1)
+        return item
+
+    recognizer = make_recognizer(name)
+
+    async def run():
+        latencies = []
+        # Задержка одной строки замеряется на первой тысяче строк
+        for text in texts[:1000]:
+            row_start = time.perf_counter()
+            await recognizer.extract_all(text)
+            latencies.append(time.perf_counter() - row_start)
+        start = time.perf_counter()
+        for i in range(0, len(texts), 256):
+            await recognizer.extract_all_batch(texts[i:i + 256])
+        return time.perf_counter() - start, latencies
+
+    elapsed, latencies = asyncio.run(run())
+    return result(name, len(texts), elapsed, latencies)
+
+
+def run_case_in_subprocess(name: str, sheet: str, rows: int, output_dir: str) -> Dict[str, object]:
+    command = [sys.executable, os.path.abspath(__file__), "--case", name, "--sheet", sheet,
+               "--rows", str(rows), "--data-dir", output_dir]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        return {"name": name, "rows": rows, "error": error[-1] if error else "неизвестная ошибка"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(results: List[Dict[str, object]], baseline_path: str) -> None:
+    """
+    Печатает отношение скорости к сохраненным ранее результатам.
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {(item["name"], item["rows"]): item for item in json.load(file)["results"]}
+    for item in results:
+        old = baseline.get((item["name"], item["rows"]))
+        if old is None or not old.get("rows_per_sec") or not item.get("rows_per_sec"):
+            continue
+        ratio = item["rows_per_sec"] / old["rows_per_sec"]
+        print(f"{item['name']:36} {item['rows']:>9} {ratio:6.2f}x от {baseline_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности преобразования таблиц")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--cases", nargs="+", default=list(TRANSFORMER_CASES) + RECOGNIZER_CASES,
+                        help="замеры: " + ", ".join(list(TRANSFORMER_CASES) + RECOGNIZER_CASES))
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(__file__), "data"))
+    parser.add_argument("--output", help="файл JSON для сохранения результатов")
+    parser.add_argument("--compare", help="файл JSON с результатами для сравнения")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--sheet", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Один замер в дочернем процессе
+    if args.case:
+        rows = args.rows[0]
+        if args.case in TRANSFORMER_CASES:
+            item = run_transformer_case(args.case, args.sheet, rows, args.data_dir)
+        else:
+            item = run_recognizer_case(args.case, rows)
+        print(json.dumps(item, ensure_ascii=False))
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = []
+    for rows in args.rows:
+        sheet = os.path.join(args.data_dir, f"legacy_{rows}.xlsx")
+        if not os.path.exists(sheet) and any(case in TRANSFORMER_CASES for case in args.cases):
+            SyntheticInventoryGenerator().write(sheet, rows)
+        for case in args.cases:
+            item = run_case_in_subprocess(case, sheet, rows, args.data_dir)
+            results.append(item)
+            if "error" in item:
+                print(f"{case:36} {rows:>9} ошибка: {item['error']}")
+            else:
+                print(f"{case:36} {item['rows']:>9} {item['rows_per_sec']:>12} строк/с "
+                      f"p50 {item['p50_ms']} мс p99 {item['p99_ms']} мс "
+                      f"память {item['peak_memory_mb']} МБ")
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
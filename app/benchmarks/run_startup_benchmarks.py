@@ -0,0 +1,100 @@
+"""
+Замеры времени холодного запуска: импорт преобразователя, вывод --help
+и первое распознавание каждым распознавателем из RecognizerRegistry.
+
+Запуск из каталога app:
+    python benchmarks/run_startup_benchmarks.py --repeat 5 --output startup.json
+
+Каждый замер выполняется в новом процессе интерпретатора, поэтому в него входят
+импорт модулей и загрузка моделей. Для распознавателя llm поднимается FakeOllamaServer.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, APP_DIR)
+
+from benchmarks.run_benchmarks import git_commit
+
+# Код, который выполняется в новом процессе для каждого замера
+STARTUP_CASES = {
+    "python": "pass",
+    "import_transformer": "import ExcelTableTransformer",
+    "import_transformer_pandas": "import ExcelTableTransformer, pandas, openpyxl",
+}
+RECOGNIZER_CODE = """
+import asyncio, os
+from NamedEntityRecognitionModels.RecognizerRegistry import create_recognizer
+options = {{"host": os.environ["OLLAMA_HOST"]}} if {name!r} == "llm" else {{}}
+asyncio.run(create_recognizer({name!r}, **options).extract_all("к.301 Кравченко А.В. расписка"))
+"""
+RECOGNIZER_CASES = ["regex", "cached", "spacy", "llm"]
+
+
+def run_once(args: List[str], env: Dict[str, str]) -> float:
+    start = time.perf_counter()
+    completed = subprocess.run(args, cwd=APP_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else "неизвестная ошибка")
+    return elapsed
+
+
+def run_case(name: str, args: List[str], repeat: int, env: Dict[str, str]) -> Dict[str, object]:
+    try:
+        times = [run_once(args, env) for _ in range(repeat)]
+    except RuntimeError as error:
+        return {"name": name, "error": str(error)}
+    return {
+        "name": name,
+        "median_ms": round(statistics.median(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры времени холодного запуска")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="файл JSON для сохранения результатов")
+    args = parser.parse_args()
+
+    from benchmarks.FakeOllamaServer import FakeOllamaServer
+    env = dict(os.environ, PYTHONPATH=APP_DIR)
+    cases = {name: [sys.executable, "-c", code] for name, code in STARTUP_CASES.items()}
+    cases["cli_help"] = [sys.executable, "ExcelTableTransformer.py", "--help"]
+    for name in RECOGNIZER_CASES:
+        cases[f"recognizer_{name}"] = [sys.executable, "-c", RECOGNIZER_CODE.format(name=name)]
+
+    results = []
+    with FakeOllamaServer() as server:
+        env["OLLAMA_HOST"] = server.url
+        for name, case_args in cases.items():
+            item = run_case(name, case_args, args.repeat, env)
+            results.append(item)
+            if "error" in item:
+                print(f"{name:28} ошибка: {item['error']}")
+            else:
+                print(f"{name:28} {item['median_ms']:>9} мс (мин. {item['min_ms']} мс)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({
+                "commit": git_commit(),
+                "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
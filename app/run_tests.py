@@ -7,6 +7,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'Name
 
 # Импортируем тесты
 from NamedEntityRecognitionModels.tests.RegexNamedEntityRecognizerTests import TestRegexNamedEntityRecognizer
+from NamedEntityRecognitionModels.tests.CachedNamedEntityRecognizerTests import TestCachedNamedEntityRecognizer
+from NamedEntityRecognitionModels.tests.RecognizerRegistryTests import TestRecognizerRegistry
+from NamedEntityRecognitionModels.tests.CascadingNamedEntityRecognizerTests import TestCascadingNamedEntityRecognizer
+from NamedEntityRecognitionModels.tests.LlmNamedEntityRecognizerTests import TestLlmNamedEntityRecognizer
+from NamedEntityRecognitionModels.tests.SpacyNamedEntityRecognizerTests import TestSpacyNamedEntityRecognizer
+from tests.ExcelTableTransformerTests import TestExcelTableTransformer
+from tests.InventoryIndexTests import TestInventoryIndex
+from tests.EntityResolverTests import TestEntityResolver
 
 if __name__ == '__main__':
     # Запускаем тесты
@@ -0,0 +1,59 @@
+import unittest
+import asyncio
+import csv
+import os
+import tempfile
+from ExcelTableTransformer import ExcelTableTransformer, NEW_TABLE_STRUCTURE
+from EntityResolver import RESOLVED_COLUMNS, EntityResolver, is_typo, normalize_cabinet, parse_person, person_id
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "src", "sample.xlsx")
+
+
+class TestEntityResolver(unittest.TestCase):
+    def test_normalize(self):
+        for value in ["301a", "301-А", "301 а", "к.301А", "301-a"]:
+            self.assertEqual(normalize_cabinet(value), "301А")
+        self.assertEqual(normalize_cabinet("402-П"), "402П")
+        self.assertEqual(normalize_cabinet(" Технический  отдел "), "Технический отдел")
+        for value in ["Иванов И.И.", "Иванов И. И.", "И.И.Иванов", "Иванов Иван Иванович"]:
+            self.assertEqual(str(parse_person(value)), "Иванов И.И.")
+        self.assertEqual(str(parse_person("Иванов")), "Иванов")
+        self.assertIsNone(parse_person("И.И."))
+
+    def test_resolve(self):
+        resolver = EntityResolver()
+        resolver.add(["Иванов И.И.", "Иванов И. И.", "И.И.Иванов", "Иванов", "Иваноф И.И.", "Null",
+                      "Петров П.П.", "Петров И.И.", "Петров"])
+        resolved = resolver.resolve()
+        for name in ["Иванов И. И.", "И.И.Иванов", "Иванов", "Иваноф И.И."]:
+            self.assertEqual(resolved[name], "Иванов И.И.")
+        self.assertNotIn("Null", resolved)
+        # Фамилия без инициалов не объединяет двух разных людей
+        self.assertEqual(resolved["Петров"], "Петров")
+        self.assertEqual(resolved["Петров П.П."], "Петров П.П.")
+
+    def test_endings_are_not_typos(self):
+        # Фамилии с другим окончанием принадлежат разным людям
+        resolver = EntityResolver()
+        names = ["Иванов И.И.", "Иванова И.И.", "Петров А.С.", "Петрова А.С.", "Кузьменко В.В.",
+                 "Кузьменков В.В.", "Ковальский О.О.", "Ковальская О.О."]
+        resolver.add(names)
+        resolved = resolver.resolve()
+        for name in names:
+            self.assertEqual(resolved[name], name)
+        # Опечатки: замена буквы, пропуск буквы и перестановка соседних букв не в окончании
+        for first, second in [("Иванов", "Иваноф"), ("Смирнов", "Смрнов"), ("Смирнов", "Сминров")]:
+            self.assertTrue(is_typo(first, second), (first, second))
+        self.assertFalse(is_typo("Петров", "Петрав"))
+        self.assertFalse(is_typo("Ли", "Ло"))
+
+    def test_transform(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "result.csv")
+            asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, resolve_entities=True))
+            with open(path, encoding="utf-8", newline="") as file:
+                rows = list(csv.reader(file))
+        self.assertEqual(rows[0], NEW_TABLE_STRUCTURE + RESOLVED_COLUMNS)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[4][-3:], ["101", "Сидоров", person_id("Сидоров")])
+        self.assertEqual(rows[7][-3:], ["402П", "Null", "Null"])
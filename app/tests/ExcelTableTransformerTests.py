@@ -0,0 +1,340 @@
+import unittest
+import asyncio
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from openpyxl import load_workbook
+from ExcelTableTransformer import ExcelTableTransformer, NEW_TABLE_STRUCTURE
+from Instrumentation import Instrumentation
+from NamedEntityRecognitionModels.CachedNamedEntityRecognizer import CachedNamedEntityRecognizer
+from NamedEntityRecognitionModels.CascadingNamedEntityRecognizer import CascadingNamedEntityRecognizer
+from NamedEntityRecognitionModels.RegexNamedEntityRecognizer import RegexNamedEntityRecognizer
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "src", "sample.xlsx")
+
+
+class FailingRecognizer(RegexNamedEntityRecognizer):
+    """
+    Распознаватель, который считает распознанные строки и завершается ошибкой
+    на пакете с номером failing_call.
+    """
+
+    def __init__(self, failing_call=2):
+        self.failing_call = failing_call
+        self.calls = 0
+        self.rows = 0
+
+    async def extract_all_batch(self, data, contexts=None):
+        self.calls += 1
+        if self.calls == self.failing_call:
+            raise RuntimeError("сбой распознавания")
+        self.rows += len(data)
+        return await super().extract_all_batch(data, contexts)
+
+
+class SlowRecognizer(RegexNamedEntityRecognizer):
+    """
+    Распознаватель, ожидающий ответа тем меньше, чем позже вызван, и считающий
+    одновременно выполняемые пакеты.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def extract_all_batch(self, data, contexts=None):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.02 / self.calls)
+            return await super().extract_all_batch(data, contexts)
+        finally:
+            self.active -= 1
+
+
+def read_xlsx(path):
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return [list(row) for row in workbook.active.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+class TestExcelTableTransformer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.expected_path = os.path.join(self.directory.name, "expected.xlsx")
+        asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(self.expected_path))
+        self.expected = read_xlsx(self.expected_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_transform(self):
+        self.assertEqual(self.expected[0], NEW_TABLE_STRUCTURE)
+        self.assertEqual(self.expected[4][2:6], ["Иванов А. В.", "Технический отдел", "101", "Сидоров"])
+
+    def test_streaming(self):
+        # Потоковый режим дает тот же результат, что и обычный, для любого размера пакета
+        for batch_size in (1, 2, 64):
+            with self.subTest(batch_size=batch_size):
+                path = os.path.join(self.directory.name, "result.xlsx")
+                asyncio.run(ExcelTableTransformer(SAMPLE_PATH, batch_size=batch_size).transform(path, streaming=True))
+                self.assertEqual(read_xlsx(path), self.expected)
+
+    def test_concurrency(self):
+        # Пакеты распознаются одновременно, но не больше concurrency сразу, порядок строк сохраняется
+        recognizer = SlowRecognizer()
+        path = os.path.join(self.directory.name, "result.xlsx")
+        asyncio.run(ExcelTableTransformer(SAMPLE_PATH, recognizer, batch_size=1).transform(path, concurrency=3))
+        self.assertEqual(read_xlsx(path), self.expected)
+        self.assertEqual(recognizer.calls, 7)
+        self.assertEqual(recognizer.max_active, 3)
+        with self.assertRaises(ValueError):
+            asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, concurrency=0))
+
+    def test_workers(self):
+        # Части по chunk_size строк обрабатываются в пуле процессов, порядок строк сохраняется
+        path = os.path.join(self.directory.name, "result.xlsx")
+        for backend in ("regex", "cached"):
+            with self.subTest(backend=backend):
+                instrumentation = Instrumentation()
+                transformer = ExcelTableTransformer(SAMPLE_PATH, backend, batch_size=2,
+                                                    instrumentation=instrumentation)
+                asyncio.run(transformer.transform(path, workers=2, chunk_size=3))
+                self.assertEqual(read_xlsx(path), self.expected)
+                self.assertEqual(instrumentation.report()["stages"]["workers"]["calls"], 3)
+        with self.assertRaises(ValueError):
+            asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, workers=-1))
+
+    def test_vectorized(self):
+        # Векторизованный режим, в том числе потоковый по частям, дает тот же результат, что и обычный
+        modes = [
+            dict(vectorized=True),
+            dict(vectorized=True, streaming=True, chunk_size=3),
+        ]
+        for mode in modes:
+            with self.subTest(**mode):
+                path = os.path.join(self.directory.name, "result.xlsx")
+                asyncio.run(ExcelTableTransformer(SAMPLE_PATH, batch_size=2).transform(path, **mode))
+                self.assertEqual(read_xlsx(path), self.expected)
+
+        # Таблица только с заголовком дает результат только с заголовком
+        source_path = os.path.join(self.directory.name, "empty.xlsx")
+        workbook = load_workbook(SAMPLE_PATH)
+        workbook.active.delete_rows(2, workbook.active.max_row)
+        workbook.save(source_path)
+        for backend in ("regex", "cached"):
+            for streaming in (False, True):
+                with self.subTest(backend=backend, streaming=streaming, empty=True):
+                    path = os.path.join(self.directory.name, "result.xlsx")
+                    asyncio.run(ExcelTableTransformer(source_path, backend).transform(
+                        path, vectorized=True, streaming=streaming))
+                    self.assertEqual(read_xlsx(path), [NEW_TABLE_STRUCTURE])
+
+    def test_missing_name(self):
+        # Пустое наименование (NaN) передается распознавателю строкой
+        source_path = os.path.join(self.directory.name, "source.xlsx")
+        workbook = load_workbook(SAMPLE_PATH)
+        workbook.active.cell(row=5, column=1).value = None
+        workbook.save(source_path)
+        for backend in ("regex", "cached"):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.directory.name, "result.xlsx")
+                asyncio.run(ExcelTableTransformer(source_path, backend).transform(path))
+                self.assertEqual(read_xlsx(path)[4][0], "nan")
+
+    def test_malformed_mol(self):
+        # "МОЛ/Место хранения" без разделителя, с несколькими разделителями и пустое
+        source_path = os.path.join(self.directory.name, "source.xlsx")
+        workbook = load_workbook(SAMPLE_PATH)
+        workbook.active.cell(row=2, column=3).value = "Иванов А. В."
+        workbook.active.cell(row=3, column=3).value = "Иванов А. В. - Технический отдел - склад"
+        workbook.active.cell(row=4, column=3).value = None
+        workbook.save(source_path)
+        for backend in ("regex", "cached"):
+            for vectorized in (False, True):
+                with self.subTest(backend=backend, vectorized=vectorized):
+                    path = os.path.join(self.directory.name, "result.xlsx")
+                    asyncio.run(ExcelTableTransformer(source_path, backend).transform(path, vectorized=vectorized))
+                    rows = read_xlsx(path)
+                    self.assertEqual([row[2:4] for row in rows[1:5]], [
+                        ["Иванов А. В.", "Null"],
+                        ["Иванов А. В.", "Технический отдел - склад"],
+                        ["nan", "Null"],
+                        ["Иванов А. В.", "Технический отдел"],
+                    ])
+
+    def test_vectorized_single_pass(self):
+        # Без регулярных выражений распознаватель получает каждую строку один раз
+        for vectorized in (False, True):
+            with self.subTest(vectorized=vectorized):
+                recognizer = CascadingNamedEntityRecognizer(
+                    [RegexNamedEntityRecognizer(), RegexNamedEntityRecognizer()])
+                path = os.path.join(self.directory.name, "result.xlsx")
+                asyncio.run(ExcelTableTransformer(SAMPLE_PATH, recognizer).transform(path, vectorized=vectorized))
+                self.assertEqual(read_xlsx(path), self.expected)
+                # В векторизованном режиме две одинаковые строки "Лифт ГМ-460" распознаются один раз
+                self.assertEqual(recognizer.cascade_info().tiers[0].rows, 6 if vectorized else 7)
+
+    def test_sinks(self):
+        csv_path = os.path.join(self.directory.name, "result.csv")
+        asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(csv_path))
+        with open(csv_path, encoding="utf-8", newline="") as file:
+            self.assertEqual(list(csv.reader(file)), self.expected)
+
+        sqlite_path = os.path.join(self.directory.name, "result.sqlite")
+        asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(sqlite_path))
+        rows = sqlite3.connect(sqlite_path).execute("SELECT * FROM inventory").fetchall()
+        self.assertEqual([list(row) for row in rows], self.expected[1:])
+
+    def test_failure_keeps_previous_result(self):
+        # Прерванное преобразование не заменяет прежний результат частичным
+        def read_csv(path):
+            with open(path, encoding="utf-8", newline="") as file:
+                return list(csv.reader(file))
+
+        def read_sqlite(path):
+            # Кроме строк проверяется, что временная таблица загрузки удалена
+            with closing(sqlite3.connect(path)) as connection:
+                return (connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+                        + connection.execute("SELECT * FROM inventory").fetchall())
+
+        readers = {"result.xlsx": read_xlsx, "result.csv": read_csv, "result.sqlite": read_sqlite}
+        for name, read in readers.items():
+            for streaming in (False, True):
+                with self.subTest(name=name, streaming=streaming):
+                    path = os.path.join(self.directory.name, name)
+                    asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, streaming=streaming))
+                    previous = read(path)
+                    transformer = ExcelTableTransformer(SAMPLE_PATH, FailingRecognizer(), batch_size=2)
+                    with self.assertRaises(RuntimeError):
+                        asyncio.run(transformer.transform(path, streaming=streaming))
+                    self.assertEqual(read(path), previous)
+                    self.assertFalse([file for file in os.listdir(self.directory.name) if file.endswith(".tmp")])
+
+    def test_incremental(self):
+        path = os.path.join(self.directory.name, "result.xlsx")
+        report = asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, incremental=True))
+        self.assertEqual((report.added, report.changed, report.unchanged), (7, 0, 0))
+        self.assertEqual(read_xlsx(path), self.expected)
+
+        # Повторный запуск копирует все строки из прошлого результата
+        report = asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, incremental=True))
+        self.assertEqual((report.added, report.changed, report.unchanged), (0, 0, 7))
+        self.assertEqual(report.deleted, [])
+        self.assertEqual(read_xlsx(path), self.expected)
+
+    def test_incremental_changes(self):
+        # Файл состояния можно хранить отдельно от результата
+        path = os.path.join(self.directory.name, "result.xlsx")
+        state_path = os.path.join(self.directory.name, "state", "inventory.sqlite")
+        os.mkdir(os.path.dirname(state_path))
+        instrumentation = Instrumentation()
+        transformer = ExcelTableTransformer(SAMPLE_PATH, batch_size=2, instrumentation=instrumentation)
+        asyncio.run(transformer.transform(path, incremental=True, workers=2, state_path=state_path))
+        self.assertEqual(read_xlsx(path), self.expected)
+        self.assertTrue(os.path.exists(state_path))
+        # Новые строки распределяются между процессами
+        self.assertEqual(instrumentation.report()["stages"]["workers"]["calls"], 2)
+
+        # Одна строка изменена, одна удалена
+        changed_path = os.path.join(self.directory.name, "changed.xlsx")
+        workbook = load_workbook(SAMPLE_PATH)
+        workbook.active.cell(row=4, column=4, value="к.305 Кузнецов")
+        workbook.active.delete_rows(6)
+        workbook.save(changed_path)
+        expected_path = os.path.join(self.directory.name, "changed_expected.xlsx")
+        asyncio.run(ExcelTableTransformer(changed_path).transform(expected_path))
+
+        report = asyncio.run(ExcelTableTransformer(changed_path, batch_size=2).transform(
+            path, incremental=True, workers=2, state_path=state_path))
+        self.assertEqual((report.added, report.changed, report.unchanged), (0, 1, 5))
+        self.assertEqual(len(report.deleted), 1)
+        self.assertEqual(read_xlsx(path), read_xlsx(expected_path))
+
+    def test_incremental_backend_change(self):
+        # Смена распознавателя за кэширующей оберткой делает все строки измененными
+        path = os.path.join(self.directory.name, "result.xlsx")
+        recognizer = CachedNamedEntityRecognizer(RegexNamedEntityRecognizer())
+        asyncio.run(ExcelTableTransformer(SAMPLE_PATH, recognizer).transform(path, incremental=True))
+        backend = FailingRecognizer(failing_call=None)
+        report = asyncio.run(ExcelTableTransformer(SAMPLE_PATH, CachedNamedEntityRecognizer(backend)).transform(
+            path, incremental=True))
+        self.assertEqual((report.added, report.changed, report.unchanged), (0, 7, 0))
+        # Новый распознаватель получает уникальные строки (две строки "Лифт ГМ-460" совпадают)
+        self.assertEqual(backend.rows, 6)
+
+    def test_incremental_resume(self):
+        path = os.path.join(self.directory.name, "result.xlsx")
+        recognizer = FailingRecognizer(failing_call=2)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(ExcelTableTransformer(SAMPLE_PATH, recognizer, batch_size=3).transform(
+                path, incremental=True, chunk_size=3))
+        self.assertEqual(recognizer.rows, 3)
+
+        # Продолжение распознает только строки после контрольной точки
+        recognizer = FailingRecognizer(failing_call=None)
+        report = asyncio.run(ExcelTableTransformer(SAMPLE_PATH, recognizer, batch_size=3).transform(
+            path, incremental=True, chunk_size=3))
+        self.assertEqual(recognizer.rows, 4)
+        self.assertTrue(report.resumed)
+        self.assertEqual((report.added, report.changed, report.unchanged), (7, 0, 0))
+        self.assertEqual(read_xlsx(path), self.expected)
+
+    def test_instrumentation(self):
+        path = os.path.join(self.directory.name, "result.xlsx")
+        report_path = os.path.join(self.directory.name, "report.json")
+        reports = []
+        instrumentation = Instrumentation(top_n=3, report_path=report_path, on_report=reports.append)
+        transformer = ExcelTableTransformer(SAMPLE_PATH, batch_size=2, instrumentation=instrumentation)
+        asyncio.run(transformer.transform(path))
+        self.assertEqual(read_xlsx(path), self.expected)
+
+        report = reports[0]
+        with open(report_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file), report)
+        self.assertEqual(report["rows"], 7)
+        self.assertTrue({"read", "ner", "build", "write"} <= set(report["stages"]))
+        call = report["calls"]["RegexNamedEntityRecognizer.extract_all_batch"]
+        self.assertEqual((call["calls"], call["items"]), (4, 7))
+        self.assertEqual(sum(call["histogram_ms"].values()), 4)
+        nulls = sum(row[4] == 'Null' for row in self.expected[1:])
+        self.assertEqual(report["nulls"]["location"], nulls)
+        # Самые медленные пакеты: 4 пакета по 2 строки, хранятся 3
+        self.assertEqual(len(report["slowest_batches"]), 3)
+        self.assertTrue(all(batch["rows"] == len(batch["texts"]) for batch in report["slowest_batches"]))
+        self.assertIn("cpu_seconds", report["stages"]["ner"])
+
+        # Одновременно распознаваемые пакеты замеряются только по часам
+        reports = []
+        instrumentation = Instrumentation(on_report=reports.append)
+        transformer = ExcelTableTransformer(SAMPLE_PATH, batch_size=2, instrumentation=instrumentation)
+        asyncio.run(transformer.transform(path, concurrency=3))
+        self.assertNotIn("cpu_seconds", reports[0]["stages"]["ner"])
+        self.assertIn("cpu_seconds", reports[0]["stages"]["build"])
+        self.assertEqual(sum(batch["rows"] for batch in reports[0]["slowest_batches"]), 7)
+
+        # Статистика вложенных распознавателей: уровни каскада и кэш второго уровня
+        reports = []
+        ner = CascadingNamedEntityRecognizer([RegexNamedEntityRecognizer(),
+                                              CachedNamedEntityRecognizer(RegexNamedEntityRecognizer())],
+                                             thresholds=1.0)
+        transformer = ExcelTableTransformer(SAMPLE_PATH, ner=ner, batch_size=2,
+                                            instrumentation=Instrumentation(on_report=reports.append))
+        asyncio.run(transformer.transform(path))
+        self.assertEqual(read_xlsx(path), self.expected)
+        recognizers = reports[0]["recognizers"]
+        self.assertEqual(set(recognizers), {"CascadingNamedEntityRecognizer",
+                                            "CascadingNamedEntityRecognizer/1:CachedNamedEntityRecognizer"})
+        tiers = recognizers["CascadingNamedEntityRecognizer"]["tiers"]
+        self.assertEqual([tier["name"] for tier in tiers],
+                         ["RegexNamedEntityRecognizer", "CachedNamedEntityRecognizer"])
+        self.assertEqual(tiers[0]["rows"], 7)
+        cache = recognizers["CascadingNamedEntityRecognizer/1:CachedNamedEntityRecognizer"]
+        self.assertEqual(cache["hits"] + cache["misses"], tiers[1]["rows"])
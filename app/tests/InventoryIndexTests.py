@@ -0,0 +1,92 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from ExcelTableTransformer import ExcelTableTransformer, NEW_TABLE_STRUCTURE
+from InventoryIndex import InventoryIndex, InventoryIndexSink, normalize_key
+from TableSinks import CsvSink, TeeSink
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "src", "sample.xlsx")
+
+
+class BrokenIndexSink(InventoryIndexSink):
+    """
+    Приемник индекса, сборка которого завершается ошибкой.
+    """
+    def _write_index(self, file):
+        raise OSError("нет места на диске")
+
+
+class TestInventoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.directory.name, "result.idx")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_transform_index(self):
+        path = os.path.join(self.directory.name, "result.csv")
+        asyncio.run(ExcelTableTransformer(SAMPLE_PATH).transform(path, index_path=self.index_path))
+        with InventoryIndex(self.index_path) as index:
+            self.assertEqual(len(index), 7)
+            self.assertEqual(index.columns, NEW_TABLE_STRUCTURE)
+            # Номер, прочитанный pandas как число, находится и в виде целого
+            self.assertEqual([row["Инвентарный номер"] for row in index.get("13035")], ["13035.0"])
+            self.assertEqual(index.get("4.005934")[0]["Ответственное лицо"], "Сидоров")
+            self.assertEqual([row["Инвентарный номер"] for row in index.by_location("101")], ["4.005934"])
+            self.assertEqual(len(index.by_responsible_person("сидоров")), 1)
+            self.assertEqual(index.get("нет такого"), [])
+            self.assertEqual(index.by_location("Null"), [])
+
+    def test_failed_index_keeps_output(self):
+        # Если индекс не собран, результат тоже не заменяется, и они не расходятся
+        path = os.path.join(self.directory.name, "result.csv")
+        previous, previous_index = "прежний результат", b"previous index"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(previous)
+        with open(self.index_path, "wb") as file:
+            file.write(previous_index)
+
+        sink = TeeSink([CsvSink(path), BrokenIndexSink(self.index_path)])
+        with self.assertRaises(OSError):
+            asyncio.run(ExcelTableTransformer(SAMPLE_PATH, batch_size=2).transform(path, sink=sink))
+        with open(path, encoding="utf-8") as file:
+            self.assertEqual(file.read(), previous)
+        with open(self.index_path, "rb") as file:
+            self.assertEqual(file.read(), previous_index)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["result.csv", "result.idx"])
+
+    def test_normalize_key(self):
+        self.assertEqual(normalize_key("13035.0"), "13035")
+        self.assertEqual(normalize_key(13035.0), "13035")
+        self.assertEqual(normalize_key(" AB-12 "), "ab-12")
+        # Строковые номера не совпадают с целыми
+        self.assertEqual(normalize_key("004.000000"), "004.000000")
+        self.assertEqual(normalize_key("004.0"), "004.0")
+        self.assertEqual(normalize_key("4.5"), "4.5")
+
+        rows = [[name, number, "МОЛ", "Null", "101", "Null"] + ["x"] * 11
+                for name, number in [("Стул", "004.000000"), ("Стол", "004")]]
+        with InventoryIndexSink(self.index_path) as sink:
+            sink.open(NEW_TABLE_STRUCTURE)
+            sink.write_rows(rows)
+        with InventoryIndex(self.index_path) as index:
+            self.assertEqual([row["Наименование"] for row in index.get("004")], ["Стол"])
+            self.assertEqual([row["Наименование"] for row in index.get("004.000000")], ["Стул"])
+
+    def test_duplicates_and_groups(self):
+        rows = [
+            [f"Стул {i}", str(i % 50), "МОЛ", "Null", str(100 + i % 7), f"Иванов{i % 3}"] + ["x"] * 11
+            for i in range(200)
+        ]
+        with InventoryIndexSink(self.index_path) as sink:
+            sink.open(NEW_TABLE_STRUCTURE)
+            sink.write_rows(rows[:120])
+            sink.write_rows(rows[120:])
+        with InventoryIndex(self.index_path) as index:
+            self.assertEqual([row["Наименование"] for row in index.get("7")],
+                             [f"Стул {i}" for i in (7, 57, 107, 157)])
+            self.assertEqual([row["Наименование"] for row in index.by_location("103")],
+                             [f"Стул {i}" for i in range(200) if i % 7 == 3])
+            self.assertEqual(len(index.by_responsible_person("Иванов2")), 66)